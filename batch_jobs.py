@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import requests
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+MAX_REQUESTS_PER_FILE = 50000  # Batch API limits per input file
+MAX_BYTES_PER_FILE = 190 * 1024 * 1024
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def write_batch_files(movie_names, build_request, directory):
+    """
+    Writes one Batch API request line per movie, splitting files at the API's size limits.
+
+    The movie name is used as the custom_id so results can be matched back. File
+    names carry a timestamp so they never overwrite the input of a batch that an
+    earlier, interrupted run may still be waiting on. Returns the list of written paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d%H%M%S")
+    paths = []
+    f = None
+    count = size = 0
+    for movie_name in movie_names:
+        line = json.dumps({
+            "custom_id": movie_name,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": build_request(movie_name),
+        }, ensure_ascii=False) + "\n"
+        encoded = len(line.encode("utf-8"))
+        if f is None or count >= MAX_REQUESTS_PER_FILE or size + encoded > MAX_BYTES_PER_FILE:
+            if f is not None:
+                f.close()
+            paths.append(os.path.join(directory, f"batch_input_{stamp}_{len(paths):04d}.jsonl"))
+            f = open(paths[-1], 'w', encoding='utf-8')
+            count = size = 0
+        f.write(line)
+        count += 1
+        size += encoded
+    if f is not None:
+        f.close()
+    return paths
+
+
+class BatchClient:
+    """
+    Minimal client for the OpenAI Files and Batches endpoints.
+    """
+
+    def __init__(self, api_base, api_key, session=None, timeout=60):
+        self.api_base = api_base.rstrip("/")
+        self.session = session or requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+        self.timeout = timeout
+
+    def _request(self, method, path, **kwargs):
+        response = self.session.request(method, self.api_base + path, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def upload_file(self, path):
+        with open(path, 'rb') as f:
+            response = self._request("POST", "/files", data={"purpose": "batch"},
+                                     files={"file": (os.path.basename(path), f)})
+        return response.json()["id"]
+
+    def create_batch(self, input_file_id, metadata=None):
+        response = self._request("POST", "/batches", json={
+            "input_file_id": input_file_id,
+            "endpoint": BATCH_ENDPOINT,
+            "completion_window": "24h",
+            "metadata": metadata or {},
+        })
+        return response.json()
+
+    def get_batch(self, batch_id):
+        return self._request("GET", f"/batches/{batch_id}").json()
+
+    def iter_file_lines(self, file_id):
+        response = self._request("GET", f"/files/{file_id}/content", stream=True)
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                yield json.loads(line)
+
+
+def read_custom_ids(path):
+    """
+    Lists the custom_ids (movie names) in a batch input file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line)["custom_id"] for line in f if line.strip()]
+
+
+def load_submissions(ledger_path):
+    """
+    Reads the {batch id: input file} map of batches submitted by an earlier run.
+    """
+    submissions = {}
+    if os.path.exists(ledger_path):
+        with open(ledger_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                submissions[entry["batch_id"]] = entry["path"]
+    return submissions
+
+
+def submit_batches(client, paths, ledger_path=None):
+    """
+    Uploads each input file and creates a batch for it. Returns {batch id: input file}.
+
+    With a ledger_path, each batch id is appended there as soon as it is created, so
+    a restarted run can reattach to it instead of paying for the titles again.
+    """
+    submissions = {}
+    for path in paths:
+        file_id = client.upload_file(path)
+        batch = client.create_batch(file_id, metadata={"source": os.path.basename(path)})
+        submissions[batch["id"]] = path
+        if ledger_path:
+            with open(ledger_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"batch_id": batch["id"], "path": path}) + "\n")
+        print(f"Submitted batch {batch['id']} for {path}.")
+    return submissions
+
+
+def wait_for_batches(client, batch_ids, poll_interval=60):
+    """
+    Polls until every batch reaches a terminal status and returns the final batch objects.
+    """
+    pending = list(batch_ids)
+    finished = {}
+    while pending:
+        for batch_id in list(pending):
+            batch = client.get_batch(batch_id)
+            if batch["status"] in TERMINAL_STATUSES:
+                finished[batch_id] = batch
+                pending.remove(batch_id)
+                print(f"Batch {batch_id} {batch['status']}.")
+        if pending:
+            time.sleep(poll_interval)
+    return [finished[batch_id] for batch_id in batch_ids]
+
+
+def iter_batch_results(client, batches, input_paths=None):
+    """
+    Yields (movie_name, response_body, error) for every request in the finished batches.
+
+    input_paths maps batch ids to their input files. Requests that have no line in
+    the output or error file, e.g. every request of a failed or cancelled batch, are
+    yielded as errors so no title goes unaccounted for.
+    """
+    for batch in batches:
+        seen = set()
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+            for result in client.iter_file_lines(file_id):
+                seen.add(result["custom_id"])
+                response = result.get("response") or {}
+                if result.get("error") or response.get("status_code", 200) != 200:
+                    yield result["custom_id"], None, result.get("error") or response.get("body")
+                else:
+                    yield result["custom_id"], response["body"], None
+
+        input_path = (input_paths or {}).get(batch["id"])
+        if input_path:
+            error = f"batch {batch['id']} ended {batch['status']} without a result for this request"
+            for custom_id in read_custom_ids(input_path):
+                if custom_id not in seen:
+                    yield custom_id, None, error
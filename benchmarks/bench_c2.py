@@ -0,0 +1,60 @@
+"""
+Compares c2.convert_review_to_dict against the previous per-section regex parser.
+
+    python benchmarks/bench_c2.py --reviews 2000
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import c2
+from corpus import generate_corpus
+
+
+def legacy_convert_review_to_dict(review_text):
+    """
+    The previous implementation: one uncompiled re.search per section, each anchored
+    on the next hard-coded header.
+    """
+    names = c2.SECTION_NAMES[1:]
+    sections = {"Title": r"\"([^\"]+)\""}
+    for name, next_name in zip(names, names[1:]):
+        sections[name] = r"\*\*" + re.escape(name) + r":\*\*(.*?)\*\*" + re.escape(next_name) + r":\*"
+    sections[names[-1]] = r"\*\*" + re.escape(names[-1]) + r":\*\*(.*?)$"
+
+    review_data = {}
+    for key, pattern in sections.items():
+        match = re.search(pattern, review_text, re.DOTALL)
+        review_data[key] = match.group(1).strip().replace("\n", " ") if match else None
+    return review_data
+
+
+def bench(parser, reviews):
+    start = time.perf_counter()
+    missing = 0
+    for review in reviews:
+        missing += sum(value is None for value in parser(review).values())
+    return time.perf_counter() - start, missing
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--reviews", type=int, default=2000)
+    arg_parser.add_argument("--drop-rate", type=float, default=0.05,
+                            help="Probability that a generated review is missing a section")
+    args = arg_parser.parse_args(argv)
+
+    reviews = [entry["review"] for entry in generate_corpus(args.reviews, drop_rate=args.drop_rate)]
+    megabytes = sum(len(review.encode("utf-8")) for review in reviews) / 1e6
+    for name, parser in (("legacy", legacy_convert_review_to_dict), ("c2", c2.convert_review_to_dict)):
+        elapsed, missing = bench(parser, reviews)
+        print(f"{name:>8}: {len(reviews) / elapsed:10.0f} reviews/s  {megabytes / elapsed:8.1f} MB/s"
+              f"  {missing} empty sections")
+
+
+if __name__ == "__main__":
+    main()
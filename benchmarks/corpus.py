@@ -0,0 +1,62 @@
+import random
+
+SECTION_NAMES = (
+    "General Information", "Director and Crew", "Main Cast", "Plot Summary", "Taglines",
+    "Themes & Symbolism", "Character Development", "Directorial Vision", "Soundtrack & Music",
+    "Production Design", "Pacing and Structure", "Cultural, Social, or Historical Context",
+    "Audience Reception & Critical Acclaim", "Trivia and Fun Facts", "Quotes & Dialogue",
+    "Legacy and Impact", "Criticism", "Conclusion", "Who Should Watch", "Overall Rating",
+    "Meta Title", "Meta Description",
+)
+WORDS = (
+    "film", "story", "director", "performance", "camera", "score", "tension", "character",
+    "audience", "theme", "visual", "emotional", "pacing", "legacy", "drama", "scene",
+)
+
+
+def _sentence(rng, words=14):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate_review(movie_name, rng=None, paragraphs=2, drop_rate=0.05):
+    """
+    Builds a synthetic markdown review shaped like the primer's output.
+
+    Each section is dropped with probability `drop_rate`, so parsers are exercised
+    on incomplete reviews as well.
+    """
+    rng = rng or random.Random(movie_name)
+    year = rng.randint(1950, 2024)
+    parts = [f"**Title:**\n\"{movie_name} ({year}) – A {rng.choice(WORDS).title()} Drama\"\n"]
+    for name in SECTION_NAMES:
+        if rng.random() < drop_rate:
+            continue
+        if name == "General Information":
+            body = (
+                f"- **Release Year:** {year}\n- **Genre:** Drama, Thriller\n"
+                f"- **Runtime:** {rng.randint(1, 3)} hours {rng.randint(0, 59)} minutes\n"
+                f"- **IMDb Rating:** {rng.randint(10, 95) / 10}/10\n- **MPAA Rating:** R\n"
+            )
+        elif name == "Director and Crew":
+            body = "- **Director:** Jane Doe\n- **Writers:** John Roe, Ann Poe\n- **Producers:** Sam Loe\n"
+        elif name == "Main Cast":
+            body = (
+                "- Lead Actors:\n  - Sarah Williams as Ellie: " + _sentence(rng, 8) +
+                "\n- Supporting Cast:\n  - Emma Stone as Tess: " + _sentence(rng, 8) + "\n"
+            )
+        else:
+            body = "\n\n".join(
+                " ".join(_sentence(rng) for _ in range(4)) for _ in range(paragraphs)
+            ) + "\n"
+        parts.append(f"**{name}:**\n{body}")
+    return "\n".join(parts)
+
+
+def generate_corpus(count, seed=0, **kwargs):
+    """
+    Yields {"movie_name", "review"} records for `count` synthetic movies.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        movie_name = f"Synthetic Movie {i}"
+        yield {"movie_name": movie_name, "review": generate_review(movie_name, rng, **kwargs)}
@@ -0,0 +1,290 @@
+"""
+Local stand-in for the OpenAI chat-completions, files and batches endpoints.
+
+    python benchmarks/fake_openai.py --port 8900 --latency lognormal --latency-ms 800 --error-rate 0.05
+
+Point the pipeline at it with OPENAI_API_BASE=http://127.0.0.1:8900/v1.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_review, WORDS, _sentence
+
+# script.py's movie_prompt ("Write the review for the movie {movie_name}.")
+MOVIE_PROMPT_RE = re.compile(r"^Write the review for the movie (?P<movie_name>.+?)\.?$", re.DOTALL)
+
+
+def movie_name_from(request):
+    """
+    Recovers the title from the user message, or uses the whole message if it doesn't follow the template.
+    """
+    content = request["messages"][-1]["content"].strip()
+    match = MOVIE_PROMPT_RE.match(content)
+    return match.group("movie_name") if match else content
+
+
+def schema_value(schema, rng):
+    """
+    A random value of the JSON-schema type declared by `schema`.
+    """
+    expected = schema.get("type")
+    if expected == "object":
+        return {key: schema_value(sub_schema, rng) for key, sub_schema in schema.get("properties", {}).items()}
+    if expected == "array":
+        return [schema_value(schema.get("items", {}), rng) for _ in range(rng.randint(1, 4))]
+    if expected == "integer":
+        return rng.randint(1950, 2024)
+    if expected == "number":
+        return rng.randint(10, 95) / 10
+    if expected == "boolean":
+        return rng.random() < 0.5
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+
+
+def function_arguments(function, movie_name, text, rng):
+    """
+    Arguments for a forced function call, shaped by the function's parameter schema.
+    """
+    arguments = schema_value(function.get("parameters", {}), rng)
+    if "title" in arguments:
+        arguments["title"] = movie_name
+    if "review" in arguments:
+        arguments["review"] = text
+    if "plot_summary" in arguments:
+        arguments["plot_summary"] = _sentence(rng)
+    return json.dumps(arguments)
+
+
+class FakeConfig:
+    def __init__(self, latency="fixed", latency_ms=0.0, error_rate=0.0, server_error_rate=0.0,
+                 paragraphs=2, chunk_chars=40, retry_after=1.0, seed=None):
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.server_error_rate = server_error_rate
+        self.paragraphs = paragraphs
+        self.chunk_chars = chunk_chars
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        """
+        One response latency in seconds drawn from the configured distribution.
+        """
+        mean = self.latency_ms / 1000
+        with self.lock:
+            if self.latency == "uniform":
+                return self.rng.uniform(0, 2 * mean)
+            if self.latency == "exponential":
+                return self.rng.expovariate(1 / mean) if mean else 0.0
+            if self.latency == "lognormal":
+                # sigma=0.5 gives a realistic long tail around the requested mean
+                return self.rng.lognormvariate(0, 0.5) * mean / 1.133 if mean else 0.0
+            return mean
+
+    def roll(self, rate):
+        with self.lock:
+            return self.rng.random() < rate
+
+
+class FakeOpenAIState:
+    def __init__(self):
+        self.files = {}
+        self.batches = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def new_id(self, prefix):
+        with self.lock:
+            self.requests += 1
+            return f"{prefix}-{self.requests}"
+
+
+def make_handler(config, state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def do_POST(self):
+            body = self._read_body()
+            if self.path.endswith("/chat/completions"):
+                return self._chat(json.loads(body))
+            if self.path.endswith("/files"):
+                return self._upload(body)
+            if self.path.endswith("/batches"):
+                return self._create_batch(json.loads(body))
+            self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_GET(self):
+            parts = self.path.rstrip("/").split("/")
+            if "batches" in parts:
+                batch = state.batches.get(parts[-1])
+                if batch is None:
+                    return self._send_json(404, {"error": {"message": "no such batch"}})
+                batch["status"] = "completed"
+                return self._send_json(200, batch)
+            if parts[-1] == "content":
+                content = state.files.get(parts[-2], b"")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/jsonl")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                return
+            self._send_json(404, {"error": {"message": "not found"}})
+
+        def _completion(self, request):
+            movie_name = movie_name_from(request)
+            rng = random.Random(movie_name)
+            text = generate_review(movie_name, rng, paragraphs=config.paragraphs)
+            prompt_tokens = sum(len(message["content"]) for message in request["messages"]) // 4
+            message = {"role": "assistant", "content": text}
+            finish_reason = "stop"
+            if request.get("functions"):
+                # Answer a forced call (or the first function) the way the API does: arguments, no content
+                name = (request.get("function_call") or {}).get("name") or request["functions"][0]["name"]
+                function = next(f for f in request["functions"] if f["name"] == name)
+                arguments = function_arguments(function, movie_name, text, rng)
+                message = {"role": "assistant", "content": None,
+                           "function_call": {"name": name, "arguments": arguments}}
+                finish_reason = "function_call"
+                text = arguments
+            return {
+                "id": state.new_id("chatcmpl"),
+                "object": "chat.completion",
+                "model": request.get("model"),
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4},
+            }
+
+        def _chat(self, request):
+            time.sleep(config.delay())
+            if config.roll(config.error_rate):
+                return self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                       {"Retry-After": str(config.retry_after)})
+            if config.roll(config.server_error_rate):
+                return self._send_json(503, {"error": {"message": "The server is overloaded", "type": "server_error"}})
+
+            completion = self._completion(request)
+            if not request.get("stream"):
+                return self._send_json(200, completion)
+
+            text = completion["choices"][0]["message"]["content"]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i in range(0, len(text), config.chunk_chars):
+                chunk = {"choices": [{"index": 0, "delta": {"content": text[i:i + config.chunk_chars]}}]}
+                self.wfile.write(b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n")
+            done = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self.wfile.write(b"data: " + json.dumps(done).encode("utf-8") + b"\n\ndata: [DONE]\n\n")
+            self.close_connection = True
+
+        def _upload(self, body):
+            # Pull the file part out of the multipart body without a full parser
+            boundary = self.headers["Content-Type"].split("boundary=")[1].encode("utf-8")
+            content = b""
+            for part in body.split(b"--" + boundary):
+                if b'name="file"' in part:
+                    content = part.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n", 1)[0]
+            file_id = state.new_id("file")
+            state.files[file_id] = content
+            self._send_json(200, {"id": file_id, "object": "file", "purpose": "batch"})
+
+        def _create_batch(self, request):
+            lines = []
+            for line in state.files[request["input_file_id"]].splitlines():
+                item = json.loads(line)
+                lines.append(json.dumps({
+                    "custom_id": item["custom_id"],
+                    "response": {"status_code": 200, "body": self._completion(item["body"])},
+                    "error": None,
+                }))
+            output_id = state.new_id("file")
+            state.files[output_id] = "\n".join(lines).encode("utf-8")
+            batch = {
+                "id": state.new_id("batch"),
+                "object": "batch",
+                "status": "in_progress",
+                "input_file_id": request["input_file_id"],
+                "output_file_id": output_id,
+                "error_file_id": None,
+            }
+            state.batches[batch["id"]] = batch
+            self._send_json(200, batch)
+
+    return Handler
+
+
+def start_server(port=0, host="127.0.0.1", **config):
+    """
+    Starts the fake API on a background thread; returns the server (server.server_port is the port).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(FakeConfig(**config), FakeOpenAIState()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency", choices=("fixed", "uniform", "exponential", "lognormal"), default="fixed",
+                        help="Latency distribution of chat completions (default: fixed)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mean completion latency in ms (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0, help="Fraction answered with 503")
+    parser.add_argument("--paragraphs", type=int, default=2, help="Paragraphs per review section (response size)")
+    parser.add_argument("--seed", type=int, help="Seed for latency and error sampling")
+
+
+def server_config(args):
+    return {
+        "latency": args.latency,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "server_error_rate": args.server_error_rate,
+        "paragraphs": args.paragraphs,
+        "seed": args.seed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8900)
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+    server = start_server(args.port, **server_config(args))
+    print(f"Fake OpenAI API on http://127.0.0.1:{server.server_port}/v1", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Offline benchmarks for the generation pipeline and the review parsers.
+
+    python benchmarks/run.py pipeline --titles 1000 --latency-ms 500 --concurrency 100
+    python benchmarks/run.py parse --reviews 100000
+
+The pipeline benchmark runs script.py against benchmarks/fake_openai.py, so it never
+calls the real API. Each measured run is a separate child process; peak RSS is that
+child's maximum resident set size.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import generate_corpus
+from fake_openai import add_server_arguments
+
+
+def run_child(args, cwd=None, env=None):
+    """
+    Runs a child process to completion; returns (elapsed seconds, peak RSS in MB, stdout).
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    stdout = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{stdout.decode(errors='replace')[-2000:]}")
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, peak_rss, stdout.decode("utf-8", errors="replace")
+
+
+def start_fake_server(args):
+    command = [sys.executable, os.path.join(BENCH_DIR, "fake_openai.py"), "--port", str(args.port),
+               "--latency", args.latency, "--latency-ms", str(args.latency_ms),
+               "--error-rate", str(args.error_rate), "--server-error-rate", str(args.server_error_rate),
+               "--paragraphs", str(args.paragraphs)]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    server.stdout.readline()  # Wait for the "listening" line
+    return server
+
+
+def bench_pipeline(args):
+    workdir = tempfile.mkdtemp(prefix="review-bench-")
+    server = start_fake_server(args)
+    try:
+        input_path = os.path.join(workdir, "titles.txt")
+        with open(input_path, 'w') as f:
+            for i in range(args.titles):
+                f.write(f"Benchmark Movie {i}\n")
+
+        env = dict(os.environ, OPENAI_API_KEY="sk-bench", OPENAI_API_BASE=f"http://127.0.0.1:{args.port}/v1")
+        command = [sys.executable, os.path.join(REPO_DIR, "script.py"), "--input", input_path, "--no-cache",
+                   "--concurrency", str(args.concurrency), "--rpm", str(args.rpm), "--tpm", str(args.tpm)]
+        command += args.script_args
+        elapsed, peak_rss, output = run_child(command, cwd=workdir, env=env)
+
+        with open(os.path.join(workdir, "output", "run_manifest.jsonl")) as f:
+            completed = sum(json.loads(line)["status"] == "completed" for line in f)
+        return {
+            "benchmark": "pipeline",
+            "titles": args.titles,
+            "completed": completed,
+            "concurrency": args.concurrency,
+            "latency": f"{args.latency}:{args.latency_ms}ms",
+            "error_rate": args.error_rate,
+            "seconds": elapsed,
+            "titles_per_second": completed / elapsed,
+            "peak_rss_mb": peak_rss,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_worker(parser, path):
+    """
+    Child-process body for the parse benchmark: parse every review in path and print stats.
+    """
+    sys.path.insert(0, REPO_DIR)
+    if parser == "c2":
+        from c2 import convert_review_to_dict
+
+        def parse(entry):
+            return convert_review_to_dict(entry["review"])
+    else:
+        from converter import process_review_data
+
+        def parse(entry):
+            return process_review_data([entry], verbose=False)
+
+    count = 0
+    size = 0
+    parse_seconds = 0.0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            started = time.perf_counter()
+            parse(entry)
+            parse_seconds += time.perf_counter() - started
+            count += 1
+            size += len(entry["review"].encode("utf-8"))
+    print(json.dumps({"reviews": count, "bytes": size, "parse_seconds": parse_seconds}))
+
+
+def bench_parse(args):
+    workdir = tempfile.mkdtemp(prefix="review-bench-")
+    try:
+        corpus_path = os.path.join(workdir, "corpus.jsonl")
+        with open(corpus_path, 'w', encoding='utf-8') as f:
+            for entry in generate_corpus(args.reviews, paragraphs=args.paragraphs, drop_rate=args.drop_rate):
+                f.write(json.dumps(entry) + "\n")
+
+        results = []
+        for parser in args.parsers:
+            elapsed, peak_rss, output = run_child(
+                [sys.executable, os.path.abspath(__file__), "parse-worker", parser, corpus_path])
+            stats = json.loads(output.strip().splitlines()[-1])
+            results.append({
+                "benchmark": f"parse:{parser}",
+                "reviews": stats["reviews"],
+                "megabytes": stats["bytes"] / 1e6,
+                "seconds": elapsed,
+                "reviews_per_second": stats["reviews"] / stats["parse_seconds"],
+                "parse_mb_per_second": stats["bytes"] / 1e6 / stats["parse_seconds"],
+                "peak_rss_mb": peak_rss,
+            })
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_results(results):
+    for result in results:
+        fields = ", ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in result.items() if key != "benchmark"
+        )
+        print(f"{result['benchmark']}: {fields}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", help="Append results as JSON lines to this file for later comparison")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pipeline = commands.add_parser("pipeline", help="End-to-end script.py run against the fake API")
+    pipeline.add_argument("--titles", type=int, default=1000)
+    pipeline.add_argument("--concurrency", type=int, default=100)
+    pipeline.add_argument("--rpm", type=int, default=1000000, help="Rate limiter budget (default: effectively off)")
+    pipeline.add_argument("--tpm", type=int, default=10 ** 10, help="Token budget (default: effectively off)")
+    pipeline.add_argument("--port", type=int, default=8900)
+    pipeline.add_argument("--keep", action="store_true", help="Keep the temporary run directory")
+    pipeline.add_argument("script_args", nargs="*", help="Extra script.py arguments (after --)")
+    add_server_arguments(pipeline)
+
+    parse = commands.add_parser("parse", help="c2/converter parsing throughput on a synthetic corpus")
+    parse.add_argument("--reviews", type=int, default=1000, help="Corpus size, e.g. 1000 to 1000000")
+    parse.add_argument("--paragraphs", type=int, default=2)
+    parse.add_argument("--drop-rate", type=float, default=0.05)
+    parse.add_argument("--parsers", nargs="+", choices=("c2", "converter"), default=["c2", "converter"])
+
+    worker = commands.add_parser("parse-worker")
+    worker.add_argument("parser")
+    worker.add_argument("path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "parse-worker":
+        parse_worker(args.parser, args.path)
+        return
+
+    results = bench_parse(args) if args.command == "parse" else [bench_pipeline(args)]
+    print_results(results)
+    if args.json:
+        with open(args.json, 'a') as f:
+            for result in results:
+                f.write(json.dumps(dict(result, timestamp=time.time())) + "\n")
+
+
+if __name__ == "__main__":
+    main()
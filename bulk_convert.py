@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def iter_records(path):
+    """
+    Streams {"movie_name", "review"} records from a JSONL file, or loads a JSON array.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".json"):
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_chunks(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def convert_chunk_c2(chunk):
+    from c2 import convert_review_to_dict
+
+    results = []
+    for entry in chunk:
+        record = convert_review_to_dict(entry["review"])
+        record["movie_name"] = entry["movie_name"]
+        results.append(record)
+    return results
+
+
+def convert_chunk_converter(chunk):
+    from converter import process_review_data
+
+    return process_review_data(chunk, verbose=False)
+
+
+PARSERS = {
+    "c2": convert_chunk_c2,
+    "converter": convert_chunk_converter,
+}
+
+
+def convert_file(input_path, output, parser="c2", workers=None, chunk_size=256):
+    """
+    Parses every review in input_path over a process pool and writes JSONL to `output` in input order.
+
+    At most two chunks per worker are in flight, so memory stays bounded on large files.
+    Returns the number of records written.
+    """
+    worker = PARSERS[parser]
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    written = 0
+
+    def drain_one():
+        nonlocal written
+        for record in pending.popleft().result():
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            written += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in iter_chunks(iter_records(input_path), chunk_size):
+            pending.append(pool.submit(worker, chunk))
+            if len(pending) >= workers * 2:
+                drain_one()
+        while pending:
+            drain_one()
+    return written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert stored raw reviews into structured records.")
+    parser.add_argument("input", help='JSONL (or JSON array) of {"movie_name", "review"} records')
+    parser.add_argument("-o", "--output", help="Output JSONL file (default: stdout)")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default="c2",
+                        help="c2: full section split; converter: flat field extraction (default: c2)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Records per worker task (default: 256)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        count = convert_file(args.input, output, parser=args.parser,
+                             workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        if args.output:
+            output.close()
+    print(f"Converted {count} reviews.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import re
 import json
 
 # Input data
@@ -9,27 +10,35 @@ input_data = [
     
 ]
 
+# Bold label lines: "**Field**: value", "**Field:** value", optionally as a "- " bullet
+LABEL_PATTERN = re.compile(
+    r"^[ \t]*(?P<bullet>[-*][ \t]+)?\*\*(?P<name>[^*\n]+?)(?::\*\*|\*\*:)[ \t]*(?P<value>[^\n]*)$",
+    re.MULTILINE,
+)
+
 # Define a function to extract details and structure them
-def process_review_data(movie_data):
+def process_review_data(movie_data, verbose=True):
     extracted_data = []
     for entry in movie_data:
         review_text = entry["review"]
-        print(f"Processing review for: {entry['movie_name']}")  # Debugging line
-        print(f"Review Text:\n{review_text}\n")  # Debugging line
+        if verbose:
+            print(f"Processing review for: {entry['movie_name']}")  # Debugging line
+            print(f"Review Text:\n{review_text}\n")  # Debugging line
 
-        # Extract fields using updated extract_value function
+        # Index the review once, then look every field up in it
+        index = index_review(review_text)
         movie_name = entry["movie_name"]
-        release_year = extract_value("Release Year", review_text)
-        rating = extract_value("MPAA Rating", review_text)
-        runtime = extract_value("Runtime", review_text)
-        imdb_rating = extract_value("IMDb Rating", review_text)
-        genre = extract_value("Genre", review_text)
-        plot_summary = extract_value("Plot Summary", review_text)
-        director = extract_value("Director", review_text)
-        writers = extract_value("Writers", review_text)
+        release_year = lookup_value(index, "Release Year", verbose)
+        rating = lookup_value(index, "MPAA Rating", verbose)
+        runtime = lookup_value(index, "Runtime", verbose)
+        imdb_rating = lookup_value(index, "IMDb Rating", verbose)
+        genre = lookup_value(index, "Genre", verbose)
+        plot_summary = lookup_value(index, "Plot Summary", verbose)
+        director = lookup_value(index, "Director", verbose)
+        writers = lookup_value(index, "Writers", verbose)
         
         # Handle 'Main Cast' extraction safely
-        stars_raw = extract_value("Main Cast", review_text)
+        stars_raw = lookup_value(index, "Main Cast", verbose)
         stars = stars_raw.split("\n") if stars_raw else []  # Only split if stars_raw is not None
 
         extracted_data.append({
@@ -41,46 +50,85 @@ def process_review_data(movie_data):
             "genre": genre,
             "plot_summary": plot_summary,
             "director": director,
-            "writers": writers.split(",") if writers else [],
-            "stars": [star.split(" as ")[0].strip() for star in stars]
+            "writers": [writer.strip() for writer in writers.split(",")] if writers else [],
+            "stars": [strip_markup(star.split(" as ")[0]) for star in stars if " as " in star]
         })
     return extracted_data
 
 
+def index_review(text):
+    """
+    Walks the review once and returns a {field name: value} index.
+
+    Inline labels ("- **Genre:** Drama") map to their value. Top-level headers with no
+    inline value ("**Plot Summary:**") map to the text up to the next top-level label,
+    with or without a value of its own. The first occurrence of a name wins.
+    """
+    index = {}
+    open_section = None
+    for match in LABEL_PATTERN.finditer(text):
+        name = match.group("name").strip()
+        value = match.group("value").strip()
+        top_level = not match.group("bullet")
+        is_header = top_level and not value
+        if top_level and open_section is not None:
+            index.setdefault(open_section[0], text[open_section[1]:match.start()].strip())
+            open_section = None
+        if is_header:
+            open_section = (name, match.end())
+        elif value:
+            index.setdefault(name, value)
+    if open_section is not None:
+        index.setdefault(open_section[0], text[open_section[1]:].strip())
+    return index
+
+
+def lookup_value(index, field_name, verbose=True):
+    value = index.get(field_name)
+    if not value:
+        if verbose:
+            print(f"Field not found: {field_name}")  # Debugging line
+        return None
+    return value
+
+
+def strip_markup(text):
+    """
+    Removes bullet and bold markers around a value.
+    """
+    return text.strip().lstrip("-*").strip().strip("*").strip()
+
 
 def extract_value(field_name, text):
-    # Look for the line starting with "**<field_name>**:" in the text
-    for line in text.splitlines():
-        if line.strip().startswith(f"**{field_name}**:"):
-            field_line = line.strip()
-            if ": " in field_line:
-                return field_line.split(": ", 1)[1].strip()
-            else:
-                return field_line.split(":", 1)[1].strip()
-    
-    # Handle bullet points and other list-based formats
-    for line in text.splitlines():
-        if line.strip().startswith("- **" + field_name + "**:"):
-            field_line = line.strip()
-            return field_line.split(": ", 1)[1].strip()
-    
-    # If not found directly, look for the first bullet point after "General Information" or similar section
-    # to extract data related to that section
-    if field_name == "Genre":
-        # Search within the general information block
-        general_info_section = text.split("**General Information:**")[1]  # Capture all after "General Information"
-        for line in general_info_section.splitlines():
-            if line.strip().startswith("- **" + field_name + "**:"):
-                field_line = line.strip()
-                return field_line.split(": ", 1)[1].strip()
+    """
+    Looks up a single field; prefer index_review() + lookup_value() when reading several.
+    """
+    return lookup_value(index_review(text), field_name)
+
+
+
+def main(argv=None):
+    """
+    Prints the fields extracted from a review file, or from the built-in example.
+    """
+    import argparse
 
-    print(f"Field not found: {field_name}")  # Debugging line
-    return None
+    parser = argparse.ArgumentParser(description="Extract structured fields from generated movie reviews.")
+    parser.add_argument("path", nargs="?",
+                        help="JSON array or JSONL file of {movie_name, review} records (default: built-in example)")
+    parser.add_argument("--quiet", action="store_true", help="Don't echo each review and its missing fields")
+    args = parser.parse_args(argv)
 
+    if args.path:
+        from bulk_convert import iter_records
+        movie_data = iter_records(args.path)
+    else:
+        movie_data = input_data
 
+    # Process input data and print the structured output
+    output_data = process_review_data(movie_data, verbose=not args.quiet)
+    print(json.dumps(output_data, indent=4))
 
-# Process input data and output result
-output_data = process_review_data(input_data)
 
-# Print the structured output
-print(json.dumps(output_data, indent=4))
+if __name__ == "__main__":
+    main()
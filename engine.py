@@ -0,0 +1,58 @@
+import asyncio
+
+_DONE = object()
+
+
+async def run_pipeline(items, handler, concurrency=100, metrics=None):
+    """
+    Runs an async handler over items with at most `concurrency` calls in flight.
+
+    Items (a plain or async iterable) are pulled lazily through a bounded queue, and
+    a worker picks up the next item as soon as its previous call finishes, so one
+    slow request never stalls the other slots. An exception escaping the handler is
+    logged and counted, and the worker moves on to the next item. If `metrics` is
+    given, queue depth and in-flight count are exported as gauges.
+    """
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    if metrics is not None:
+        metrics.set_gauge("queue_depth", queue.qsize)
+        metrics.set_gauge("in_flight", 0)
+
+    async def producer():
+        if hasattr(items, "__aiter__"):
+            async for item in items:
+                await queue.put(item)
+        else:
+            for item in items:
+                await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(_DONE)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            try:
+                if item is _DONE:
+                    return
+                if metrics is not None:
+                    metrics.add_gauge("in_flight", 1)
+                try:
+                    await handler(item)
+                except Exception as e:
+                    # A worker that died here would shrink the pool until the producer blocks forever
+                    print(f"Unhandled error processing {item!r}: {e!r}")
+                    if metrics is not None:
+                        metrics.increment("handler_errors")
+                finally:
+                    if metrics is not None:
+                        metrics.add_gauge("in_flight", -1)
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        await producer()
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
@@ -0,0 +1,123 @@
+import time
+import threading
+
+
+class ConnectionPool:
+    """
+    One explicitly sized, keep-alive HTTP pool shared by every OpenAI call.
+
+    The sync side installs a requests.Session as openai.requestssession. The async
+    side opens an aiohttp.ClientSession inside the event loop and installs it as
+    openai.aiosession. Connection setup is traced so pool behaviour can be measured.
+    """
+
+    def __init__(self, size=100, connect_timeout=10.0, read_timeout=120.0, keepalive_timeout=75.0):
+        self.size = size
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = (connect_timeout, read_timeout)
+        self._session = None
+        self._aiosession = None
+        self._aiosession_token = None
+        self._lock = threading.Lock()
+        self._async_stats = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connect_seconds": 0.0,
+        }
+
+    def sync_session(self):
+        """
+        Returns the shared requests.Session, creating and installing it on first use.
+        """
+        with self._lock:
+            if self._session is None:
+                import openai
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.size, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                openai.requestssession = session
+                self._session = session
+        return self._session
+
+    async def __aenter__(self):
+        import openai
+        import aiohttp
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_connection_create_start.append(self._on_connection_create_start)
+        trace.on_connection_create_end.append(self._on_connection_create_end)
+        trace.on_connection_reuseconn.append(self._on_connection_reuse)
+        connector = aiohttp.TCPConnector(
+            limit=self.size,
+            limit_per_host=self.size,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self._aiosession = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+        self._aiosession_token = openai.aiosession.set(self._aiosession)
+        return self
+
+    async def __aexit__(self, *exc):
+        import openai
+
+        openai.aiosession.reset(self._aiosession_token)
+        await self._aiosession.close()
+        self._aiosession = None
+
+    async def _on_request_start(self, session, context, params):
+        self._async_stats["requests"] += 1
+
+    async def _on_connection_create_start(self, session, context, params):
+        context.connect_started = time.perf_counter()
+
+    async def _on_connection_create_end(self, session, context, params):
+        self._async_stats["connections_created"] += 1
+        self._async_stats["connect_seconds"] += time.perf_counter() - context.connect_started
+
+    async def _on_connection_reuse(self, session, context, params):
+        self._async_stats["connections_reused"] += 1
+
+    def metrics(self):
+        """
+        Pool statistics: async request/connection counters plus per-host sync pool usage.
+        """
+        stats = dict(self._async_stats)
+        created = stats["connections_created"]
+        stats["avg_connect_ms"] = stats["connect_seconds"] / created * 1000 if created else 0.0
+        if self._aiosession is not None:
+            stats["async_pool_limit"] = self.size
+        if self._session is not None:
+            stats["sync_pools"] = {}
+            for adapter in set(self._session.adapters.values()):
+                for key in adapter.poolmanager.pools.keys():
+                    pool = adapter.poolmanager.pools[key]
+                    stats["sync_pools"][f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                        "connections_created": pool.num_connections,
+                        "requests": pool.num_requests,
+                        "idle": pool.pool.qsize() if pool.pool else 0,
+                    }
+        return stats
+
+    def register_gauges(self, metrics, prefix="connection_pool"):
+        """
+        Publishes the pool statistics as gauges on `metrics`, read whenever they are exported.
+
+        Sync pools are summed over hosts, e.g. connection_pool_sync_requests.
+        """
+        def stat(name):
+            return lambda: self.metrics()[name]
+
+        def sync_total(name):
+            return lambda: sum(pool[name] for pool in self.metrics().get("sync_pools", {}).values())
+
+        for name in ("requests", "connections_created", "connections_reused", "avg_connect_ms"):
+            metrics.set_gauge(f"{prefix}_{name}", stat(name))
+        for name in ("requests", "connections_created", "idle"):
+            metrics.set_gauge(f"{prefix}_sync_{name}", sync_total(name))
+        metrics.set_gauge(f"{prefix}_size", self.size)
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    SQLite-backed work queue shared by a coordinator and any number of worker processes.
+
+    The coordinator enqueues titles and collects finished jobs; workers lease titles,
+    extend their leases with heartbeats while the calls run, and ack a review or a
+    failure. A lease that is not renewed expires and the title goes back to pending,
+    so a crashed worker's jobs are picked up by the others.
+
+    This backend is single-host: every process opens the same database file, and
+    SQLite's WAL mode needs shared memory, which a network filesystem doesn't provide.
+    It scales a run across the processes of one machine and lets the coordinator/worker
+    flow be tested locally. A queue shared between hosts (a database server, Redis)
+    only has to provide the same methods: reset, set_settings, settings, enqueue,
+    retry_failed, requeue_expired, lease, heartbeat, ack, fail, release, collect,
+    outstanding and counts.
+
+    The coordinator also records its run settings (output format, model, fingerprint)
+    in the queue, so every worker generates reviews the same way whatever flags it
+    was started with.
+    """
+
+    def __init__(self, path, lease_seconds=120, max_leases=5):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_leases = max_leases
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " movie_name TEXT PRIMARY KEY, status TEXT NOT NULL, worker TEXT, lease_expires REAL,"
+            " leases INTEGER NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT, error TEXT, collected INTEGER NOT NULL DEFAULT 0,"
+            " enqueued REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_collect ON jobs (collected, status)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can't lease the same row
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def reset(self):
+        """
+        Drops every job and run setting, e.g. at the start of a fresh (non-resumed) run.
+        """
+        with self._transaction() as db:
+            db.execute("DELETE FROM jobs")
+            db.execute("DELETE FROM settings")
+
+    def set_settings(self, **settings):
+        """
+        Records run settings for the workers; keys not given keep their current value.
+        """
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in settings.items()],
+            )
+
+    def settings(self):
+        """
+        Returns the run settings recorded by the coordinator ({} before it has started).
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT key, value FROM settings").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def enqueue(self, movie_names, chunk_size=1000):
+        """
+        Adds titles as pending jobs, skipping ones already queued; returns the number added.
+        """
+        added = 0
+        chunk = []
+
+        def flush():
+            nonlocal added
+            now = time.time()
+            with self._transaction() as db:
+                before = db.total_changes
+                db.executemany(
+                    "INSERT OR IGNORE INTO jobs (movie_name, status, enqueued, updated) VALUES (?, ?, ?, ?)",
+                    [(movie_name, PENDING, now, now) for movie_name in chunk],
+                )
+                added += db.total_changes - before
+            chunk.clear()
+
+        for movie_name in movie_names:
+            chunk.append(movie_name)
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+        return added
+
+    def retry_failed(self):
+        """
+        Puts failed titles back to pending so a resumed run tries them again; returns how many.
+        """
+        with self._transaction() as db:
+            return db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, leases = 0, error = NULL, collected = 0, updated = ?"
+                " WHERE status = ?",
+                (PENDING, time.time(), FAILED),
+            ).rowcount
+
+    def _requeue_expired(self, db, now):
+        # Titles whose lease keeps expiring are probably crashing workers; stop handing them out
+        db.execute(
+            "UPDATE jobs SET status = ?, error = 'lease expired too many times', collected = 0, updated = ?"
+            " WHERE status = ? AND lease_expires < ? AND leases >= ?",
+            (FAILED, now, LEASED, now, self.max_leases),
+        )
+        return db.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL, updated = ?"
+            " WHERE status = ? AND lease_expires < ?",
+            (PENDING, now, LEASED, now),
+        ).rowcount
+
+    def requeue_expired(self):
+        """
+        Returns expired leases to pending; returns how many were requeued.
+        """
+        with self._transaction() as db:
+            return self._requeue_expired(db, time.time())
+
+    def lease(self, worker, limit=1):
+        """
+        Leases up to `limit` pending titles to `worker`; returns their names.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            self._requeue_expired(db, now)
+            names = [row[0] for row in db.execute(
+                "SELECT movie_name FROM jobs WHERE status = ? ORDER BY enqueued LIMIT ?", (PENDING, limit))]
+            db.executemany(
+                "UPDATE jobs SET status = ?, worker = ?, lease_expires = ?, leases = leases + 1, updated = ?"
+                " WHERE movie_name = ?",
+                [(LEASED, worker, now + self.lease_seconds, now, name) for name in names],
+            )
+        return names
+
+    def heartbeat(self, worker, movie_names):
+        """
+        Extends the worker's leases on the given titles; returns how many it still holds.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            return sum(db.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE movie_name = ? AND worker = ? AND status = ?",
+                (now + self.lease_seconds, now, name, worker, LEASED),
+            ).rowcount for name in movie_names)
+
+    def ack(self, worker, movie_name, result, attempts=1):
+        """
+        Stores a finished review. The first result wins if an expired lease was re-run elsewhere.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            return db.execute(
+                "UPDATE jobs SET status = ?, worker = ?, result = ?, error = NULL, attempts = attempts + ?,"
+                " lease_expires = NULL, collected = 0, updated = ? WHERE movie_name = ? AND status != ?",
+                (DONE, worker, json.dumps(result, ensure_ascii=False), attempts, now, movie_name, DONE),
+            ).rowcount == 1
+
+    def fail(self, worker, movie_name, error, attempts=1):
+        """
+        Marks a title failed after the worker gave up on it.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            return db.execute(
+                "UPDATE jobs SET status = ?, error = ?, attempts = attempts + ?, lease_expires = NULL,"
+                " collected = 0, updated = ? WHERE movie_name = ? AND worker = ? AND status = ?",
+                (FAILED, str(error), attempts, now, movie_name, worker, LEASED),
+            ).rowcount == 1
+
+    def release(self, worker, movie_names):
+        """
+        Hands unfinished titles back to the queue, e.g. when a worker shuts down.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.executemany(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL, leases = MAX(leases - 1, 0),"
+                " updated = ? WHERE movie_name = ? AND worker = ? AND status = ?",
+                [(PENDING, now, name, worker, LEASED) for name in movie_names],
+            )
+
+    def collect(self, limit=1000):
+        """
+        Returns finished jobs not yet collected as (movie_name, status, result, error, attempts) tuples.
+        """
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT movie_name, status, result, error, attempts FROM jobs"
+                " WHERE collected = 0 AND status IN (?, ?) LIMIT ?",
+                (DONE, FAILED, limit),
+            ).fetchall()
+            db.executemany("UPDATE jobs SET collected = 1 WHERE movie_name = ?", [(row[0],) for row in rows])
+        return [
+            (name, status, json.loads(result) if result is not None else None, error, attempts)
+            for name, status, result, error, attempts in rows
+        ]
+
+    def outstanding(self, exclude_worker=None):
+        """
+        Number of titles still pending or leased (optionally ignoring one worker's own leases).
+        """
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? OR (status = ? AND worker IS NOT ?)",
+                (PENDING, LEASED, exclude_worker),
+            ).fetchone()[0]
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
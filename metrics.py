@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    Latency samples kept in a fixed-size reservoir, plus exact count and sum.
+    """
+
+    def __init__(self, size=2048):
+        self.size = size
+        self.samples = []
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            # Reservoir sampling keeps a uniform sample of the whole run
+            slot = random.randrange(self.count)
+            if slot < self.size:
+                self.samples[slot] = value
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class Metrics:
+    """
+    Per-stage timers, counters and gauges for the generation pipeline, exportable as
+    Prometheus text or a JSON summary.
+    """
+
+    def __init__(self, prefix="review_pipeline"):
+        self.prefix = prefix
+        self.started = time.monotonic()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        """
+        Sets a gauge to a number, or to a zero-argument callable read at export time.
+        """
+        with self._lock:
+            self.gauges[name] = value
+
+    def add_gauge(self, name, delta):
+        with self._lock:
+            self.gauges[name] = self.gauges.get(name, 0) + delta
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def uptime(self):
+        return time.monotonic() - self.started
+
+    def _gauge_values(self):
+        return {name: value() if callable(value) else value for name, value in self.gauges.items()}
+
+    def summary(self):
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = self._gauge_values()
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "mean_ms": histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                    **{f"p{int(q * 100)}_ms": value * 1000 for q, value in histogram.quantiles().items()},
+                }
+                for stage, histogram in self.histograms.items()
+            }
+        return {"uptime_seconds": self.uptime(), "counters": counters, "gauges": gauges, "stages": stages}
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {self.prefix}_{name}_total counter")
+                lines.append(f"{self.prefix}_{name}_total {value}")
+            for name, value in sorted(self._gauge_values().items()):
+                lines.append(f"# TYPE {self.prefix}_{name} gauge")
+                lines.append(f"{self.prefix}_{name} {value}")
+            if self.histograms:
+                metric = f"{self.prefix}_stage_seconds"
+                lines.append(f"# TYPE {metric} summary")
+                for stage, histogram in sorted(self.histograms.items()):
+                    for q, value in histogram.quantiles().items():
+                        lines.append(f'{metric}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serves /metrics (Prometheus text) and /metrics.json from a background thread.
+        """
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/metrics.json":
+                    body = json.dumps(metrics.summary()).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path == "/metrics":
+                    body = metrics.render_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def report_periodically(self, path, interval=30.0):
+        """
+        Rewrites a JSON summary to `path` every `interval` seconds; returns a stop event.
+        """
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                self.write_summary(path)
+
+        threading.Thread(target=loop, daemon=True).start()
+        return stop
+
+    def write_summary(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.summary(), f, indent=4)
+        os.replace(tmp_path, path)
@@ -0,0 +1,115 @@
+import time
+import asyncio
+import threading
+
+
+def estimate_request_tokens(request):
+    """
+    Estimates the tokens a ChatCompletion request reserves: prompt (~4 chars/token) plus max_tokens.
+    """
+    prompt_chars = sum(len(message["content"]) for message in request["messages"])
+    return prompt_chars // 4 + request.get("max_tokens", 0)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` units, holding at most one minute's budget.
+
+    reserve() takes the units immediately (the bucket may go into debt) and returns
+    how long the caller must wait, so concurrent callers queue up fairly.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute budget for OpenAI calls.
+    """
+
+    def __init__(self, requests_per_minute=3500, tokens_per_minute=90000):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def _reserve(self, tokens):
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    async def acquire(self, tokens):
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def is_overload_error(error):
+    """
+    True for 429 and 5xx responses, which mean we should slow down.
+    """
+    status = getattr(error, "http_status", None)
+    if status is None:
+        return type(error).__name__ in ("RateLimitError", "ServiceUnavailableError")
+    return status == 429 or status >= 500
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency controller: additive increase on success, multiplicative decrease on overload.
+
+    Use as `async with controller:` around each request, then report the outcome with
+    on_success() or on_overload().
+    """
+
+    def __init__(self, initial=10, minimum=1, maximum=100, decrease_factor=0.5, cooldown=5.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = None
+
+    def _get_condition(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def __aenter__(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def on_success(self):
+        # Roughly +1 slot per window of `limit` successful requests
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_overload(self):
+        # Only halve once per cooldown so one burst of 429s doesn't collapse the limit
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        print(f"Rate limited, reducing concurrency to {int(self.limit)}.")
@@ -0,0 +1,39 @@
+from response_cache import request_key
+
+# Stands in for the title when hashing the request template
+TEMPLATE_MOVIE_NAME = "{movie_name}"
+
+
+def request_fingerprint(build_request):
+    """
+    Short hash of everything that shapes a review except the title: prompts, model and parameters.
+
+    `build_request` is called with a placeholder title, so the hash covers the prompt
+    templates rather than one movie's messages. max_tokens is left out, as in the
+    response cache key, because the token budget resizes it between runs.
+    """
+    return request_key(build_request(TEMPLATE_MOVIE_NAME))[:16]
+
+
+def stored_fingerprints(reviews):
+    """
+    Maps each movie in a review log to the fingerprint of its latest review (None if untagged or partial).
+    """
+    fingerprints = {}
+    for review in reviews:
+        fingerprints[review.get("movie_name")] = None if review.get("partial") else review.get("fingerprint")
+    return fingerprints
+
+
+def plan_regeneration(movie_names, fingerprints, current, popularity=None):
+    """
+    Returns the titles whose stored review is missing or was made with another fingerprint.
+
+    With a popularity map the most popular stale titles come first; titles without a
+    score keep their input order after the scored ones.
+    """
+    stale = [name for name in movie_names if fingerprints.get(name) != current]
+    if popularity:
+        # sorted() is stable, so ties and unscored titles stay in input order
+        stale.sort(key=lambda name: -popularity.get(name, float("-inf")))
+    return stale
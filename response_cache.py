@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+# Parameters that don't change what a completion says; max_tokens is resized between runs
+IGNORED_PARAMETERS = ("max_tokens", "stream")
+
+
+def request_key(request):
+    """
+    Content address of a request: SHA-256 of its canonical JSON (model, messages and parameters).
+    """
+    request = {key: value for key, value in request.items() if key not in IGNORED_PARAMETERS}
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of API responses with TTL expiry and size-based LRU eviction.
+
+    Expired entries are purged on open. The number of entries is tracked in memory,
+    so a put only counts the table when the cache may have outgrown max_entries.
+    """
+
+    def __init__(self, path, ttl=30 * 24 * 3600, max_entries=200000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.purge_expired()
+        self._count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, request):
+        key = request_key(request)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    self._count -= self._db.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, request, response):
+        # max_tokens isn't part of the key, so a truncated completion must not be reused
+        if response["choices"][0].get("finish_reason") == "length":
+            return
+        key = request_key(request)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), now, now),
+            )
+            # Replacing an existing key overcounts; the exact count is taken before evicting
+            self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        self._count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if self._count > self.max_entries:
+            # Drop the least recently used tenth in one go so eviction stays amortized
+            excess = self._count - self.max_entries + self.max_entries // 10
+            self._count -= self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (excess,),
+            ).rowcount
+
+    def discard(self, request):
+        with self._lock:
+            self._count -= self._db.execute(
+                "DELETE FROM responses WHERE key = ?", (request_key(request),)).rowcount
+
+    def purge_expired(self):
+        """
+        Deletes entries older than the TTL; returns how many. Called when the cache is opened.
+        """
+        if not self.ttl:
+            return 0
+        with self._lock:
+            purged = self._db.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)).rowcount
+            self._count -= purged
+        return purged
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
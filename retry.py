@@ -0,0 +1,166 @@
+import os
+import time
+import random
+import asyncio
+import threading
+
+RETRYABLE = "retryable"
+FATAL = "fatal"
+
+_RETRYABLE_TYPES = (
+    "Timeout", "TimeoutError", "APIConnectionError", "TryAgain", "RateLimitError",
+    "ServiceUnavailableError", "APIError", "ConnectionError", "ClientError",
+    "ServerDisconnectedError", "ClientPayloadError", "PartialReviewError", "ReviewValidationError",
+    "TruncatedReviewError",
+)
+
+
+def classify_error(error):
+    """
+    Sorts an exception into RETRYABLE (timeouts, 408/409/429, 5xx, dropped connections,
+    malformed model output) or FATAL (auth, bad request and anything unknown).
+    """
+    status = getattr(error, "http_status", None)
+    if status is not None:
+        return RETRYABLE if status in (408, 409, 429) or status >= 500 else FATAL
+    for cls in type(error).__mro__:
+        if cls.__name__ in _RETRYABLE_TYPES:
+            return RETRYABLE
+    return FATAL
+
+
+def retry_after(error):
+    """
+    Seconds the server asked us to wait, from a Retry-After header if the error carries one.
+    """
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    Allows fast retries up to a fraction of successful calls so an outage doesn't turn
+    into a retry storm; retries beyond it are slowed down by RetryPolicy, not dropped.
+    """
+
+    def __init__(self, ratio=0.2, reserve=10):
+        self.ratio = ratio
+        self.tokens = float(reserve)
+        self.reserve = float(reserve)
+        self._lock = threading.Lock()
+
+    def on_success(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.reserve * 10)
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetriesExhausted(Exception):
+    """
+    Raised once a title runs out of attempts or time; wraps the last error.
+    """
+
+    def __init__(self, error, attempts, reason):
+        super().__init__(f"{reason} after {attempts} attempt(s): {error}")
+        self.error = error
+        self.attempts = attempts
+        self.reason = reason
+
+
+class RetryPolicy:
+    """
+    Retries retryable errors with full-jitter exponential backoff, within a per-title deadline.
+
+    While the shared retry budget is empty, retries still happen but wait the full
+    max_delay, so a high transient failure rate throttles the run instead of sending
+    titles to the dead-letter file after their first error.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=60.0, deadline=600.0, budget=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget = budget or RetryBudget()
+
+    def backoff(self, attempt, error=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        server_delay = retry_after(error) if error is not None else None
+        return max(delay, server_delay or 0)
+
+    def _next_delay(self, error, attempt, started):
+        """
+        Returns how long to wait before the next attempt, or raises RetriesExhausted.
+        """
+        if classify_error(error) == FATAL:
+            raise RetriesExhausted(error, attempt, "fatal error")
+        if attempt >= self.max_attempts:
+            raise RetriesExhausted(error, attempt, "out of attempts")
+        delay = self.backoff(attempt, error)
+        if not self.budget.try_spend():
+            delay = max(delay, self.max_delay)
+        if time.monotonic() - started + delay > self.deadline:
+            raise RetriesExhausted(error, attempt, "deadline exceeded")
+        return delay
+
+    async def run(self, func):
+        """
+        Awaits func() until it succeeds; returns (result, attempts).
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = await func()
+            except Exception as e:
+                await asyncio.sleep(self._next_delay(e, attempt, started))
+                continue
+            self.budget.on_success()
+            return result, attempt
+
+
+class DeadLetterQueue:
+    """
+    Titles that could not be generated in this run, written one per line by flush()
+    so the file can be fed back as --input (even while it is the current input).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.titles = []
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        return len(self.titles)
+
+    def add(self, movie_name):
+        with self._lock:
+            self.titles.append(movie_name)
+
+    def flush(self):
+        """
+        Replaces the dead-letter file with this run's failures, or removes it if there were none.
+        """
+        with self._lock:
+            if not self.titles:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(movie_name + "\n" for movie_name in self.titles)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,262 @@
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from converter import index_review
+
+YEAR_RE = re.compile(r"\b(18|19|20)\d{2}\b")
+NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    movie_name TEXT NOT NULL UNIQUE,
+    movie_key TEXT NOT NULL,
+    year INTEGER,
+    genre TEXT,
+    imdb_rating REAL,
+    mpaa_rating TEXT,
+    review TEXT,
+    record TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_movie_key ON reviews (movie_key);
+CREATE INDEX IF NOT EXISTS reviews_year ON reviews (year);
+CREATE INDEX IF NOT EXISTS reviews_imdb_rating ON reviews (imdb_rating);
+CREATE INDEX IF NOT EXISTS reviews_mpaa_rating ON reviews (mpaa_rating);
+
+CREATE TABLE IF NOT EXISTS review_genres (
+    review_id INTEGER NOT NULL REFERENCES reviews (id) ON DELETE CASCADE,
+    genre TEXT NOT NULL,
+    PRIMARY KEY (genre, review_id)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5 (
+    movie_name, review, content='reviews', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS reviews_ai AFTER INSERT ON reviews BEGIN
+    INSERT INTO reviews_fts (rowid, movie_name, review) VALUES (new.id, new.movie_name, new.review);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_ad AFTER DELETE ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, movie_name, review)
+    VALUES ('delete', old.id, old.movie_name, old.review);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_au AFTER UPDATE ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, movie_name, review)
+    VALUES ('delete', old.id, old.movie_name, old.review);
+    INSERT INTO reviews_fts (rowid, movie_name, review) VALUES (new.id, new.movie_name, new.review);
+END;
+"""
+
+
+def movie_key(movie_name):
+    return " ".join(movie_name.casefold().split())
+
+
+def fts_query(text):
+    """
+    Turns free text into an FTS5 query matching every word, with each word quoted as a literal.
+
+    Punctuation in titles ("Black Panther: Wakanda", "Spider-Man", "T'Challa") would
+    otherwise be read as FTS5 column filters or operators.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+
+def _first_number(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_RE.search(value or "")
+    return float(match.group(0)) if match else None
+
+
+def _year(value):
+    if isinstance(value, int):
+        return value
+    match = YEAR_RE.search(str(value or ""))
+    return int(match.group(0)) if match else None
+
+
+def extract_columns(review):
+    """
+    Pulls the indexed columns out of a stored review, structured or markdown.
+    """
+    if "review" in review and "genre" not in review:
+        # Markdown record: read the labelled fields from the text
+        fields = index_review(review.get("review") or "")
+        year, genre = fields.get("Release Year"), fields.get("Genre")
+        imdb_rating, mpaa_rating = fields.get("IMDb Rating"), fields.get("MPAA Rating")
+    else:
+        year, genre = review.get("release_year"), review.get("genre")
+        imdb_rating, mpaa_rating = review.get("imdb_rating"), review.get("rating") or review.get("mpaa_rating")
+
+    genres = [g.strip() for g in re.split(r"[,/]", genre or "") if g.strip()]
+    if mpaa_rating:
+        # Keep only the rating code ("PG-13 for intense action" -> "PG-13") so it can be matched exactly
+        mpaa_rating = mpaa_rating.split()[0]
+    return {
+        "year": _year(year),
+        "genre": ", ".join(genres) or None,
+        "genres": genres,
+        "imdb_rating": _first_number(imdb_rating),
+        "mpaa_rating": mpaa_rating,
+    }
+
+
+class ReviewDatabase:
+    """
+    SQLite review store indexed by name, year, genre and rating, with FTS5 search over review text.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _upsert(self, review):
+        columns = extract_columns(review)
+        movie_name = review["movie_name"]
+        body = review.get("review") or ""
+        row = self._db.execute(
+            "INSERT INTO reviews (movie_name, movie_key, year, genre, imdb_rating, mpaa_rating, review, record, updated)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (movie_name) DO UPDATE SET year = excluded.year, genre = excluded.genre,"
+            " imdb_rating = excluded.imdb_rating, mpaa_rating = excluded.mpaa_rating,"
+            " review = excluded.review, record = excluded.record, updated = excluded.updated"
+            " RETURNING id",
+            (movie_name, movie_key(movie_name), columns["year"], columns["genre"], columns["imdb_rating"],
+             columns["mpaa_rating"], body, json.dumps(review, ensure_ascii=False), time.time()),
+        ).fetchone()
+        self._db.execute("DELETE FROM review_genres WHERE review_id = ?", (row[0],))
+        self._db.executemany(
+            "INSERT OR IGNORE INTO review_genres (review_id, genre) VALUES (?, ?)",
+            [(row[0], genre.casefold()) for genre in columns["genres"]],
+        )
+
+    def add(self, review):
+        """
+        Inserts or replaces one review (keyed on movie_name).
+        """
+        with self._lock, self._db:
+            self._upsert(review)
+
+    def add_many(self, reviews):
+        """
+        Bulk-loads reviews in one transaction; returns the number written.
+        """
+        count = 0
+        with self._lock, self._db:
+            for review in reviews:
+                self._upsert(review)
+                count += 1
+        return count
+
+    def _rows(self, sql, params):
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [json.loads(row["record"]) for row in rows]
+
+    def get(self, movie_name):
+        """
+        Looks a review up by name, ignoring case and extra whitespace.
+        """
+        rows = self._rows("SELECT record FROM reviews WHERE movie_key = ? LIMIT 1", (movie_key(movie_name),))
+        return rows[0] if rows else None
+
+    def search(self, text, limit=20, raw=False):
+        """
+        Full-text search over movie names and review bodies, best matches first.
+
+        Every word must match; pass raw=True to use FTS5 query syntax (OR, NEAR, prefix*) instead.
+        """
+        query = text if raw else fts_query(text)
+        if not query.strip():
+            return []
+        return self._rows(
+            "SELECT reviews.record FROM reviews_fts JOIN reviews ON reviews.id = reviews_fts.rowid"
+            " WHERE reviews_fts MATCH ? ORDER BY bm25(reviews_fts) LIMIT ?",
+            (query, limit),
+        )
+
+    def query(self, genre=None, year=None, min_rating=None, mpaa_rating=None, limit=50):
+        """
+        Filters by genre, release year, minimum IMDb rating and MPAA rating; highest rated first.
+        """
+        sql = "SELECT reviews.record FROM reviews"
+        where, params = [], []
+        if genre:
+            sql += " JOIN review_genres ON review_genres.review_id = reviews.id"
+            where.append("review_genres.genre = ?")
+            params.append(genre.casefold())
+        if year is not None:
+            where.append("reviews.year = ?")
+            params.append(year)
+        if min_rating is not None:
+            where.append("reviews.imdb_rating >= ?")
+            params.append(min_rating)
+        if mpaa_rating:
+            where.append("reviews.mpaa_rating = ?")
+            params.append(mpaa_rating)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY reviews.imdb_rating DESC LIMIT ?"
+        params.append(limit)
+        return self._rows(sql, params)
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load and query the indexed review database.")
+    parser.add_argument("--db", default="output/reviews.sqlite3", help="Database path (default: output/reviews.sqlite3)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("import", help="Load reviews from a JSONL log or JSON array")
+    load.add_argument("path")
+    get = commands.add_parser("get", help="Look up one movie by name")
+    get.add_argument("movie_name")
+    search = commands.add_parser("search", help="Full-text search")
+    search.add_argument("text")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--raw", action="store_true", help="Treat the text as an FTS5 query (OR, NEAR, prefix*)")
+    query = commands.add_parser("query", help="Filter by genre, year and rating")
+    query.add_argument("--genre")
+    query.add_argument("--year", type=int)
+    query.add_argument("--min-rating", type=float)
+    query.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    database = ReviewDatabase(args.db)
+    try:
+        if args.command == "import":
+            from bulk_convert import iter_records
+            count = database.add_many(iter_records(args.path))
+            print(f"Imported {count} reviews into {args.db}.")
+        elif args.command == "get":
+            print(json.dumps(database.get(args.movie_name), indent=4, ensure_ascii=False))
+        elif args.command == "search":
+            for review in database.search(args.text, limit=args.limit, raw=args.raw):
+                print(review["movie_name"])
+        else:
+            for review in database.query(genre=args.genre, year=args.year, min_rating=args.min_rating,
+                                         limit=args.limit):
+                print(review["movie_name"])
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import json
+
+_STRING = {"type": "string"}
+_STRINGS = {"type": "array", "items": _STRING}
+
+# Declared shape of a structured review, sent to the model as a function signature
+REVIEW_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": _STRING,
+        "release_year": {"type": "integer"},
+        "rating": {"type": "string", "description": "MPAA rating code, e.g. PG-13"},
+        "mpaa_rating": {"type": "string", "description": "Full MPAA rating text"},
+        "runtime": {"type": "string", "description": "e.g. 2h 22m"},
+        "imdb_rating": {"type": "number"},
+        "your_rating": {"type": "number", "description": "Reviewer score out of 10"},
+        "genre": _STRING,
+        "language": _STRING,
+        "country_of_origin": _STRING,
+        "release_date": _STRING,
+        "director": _STRING,
+        "writers": _STRINGS,
+        "producers": _STRINGS,
+        "stars": _STRINGS,
+        "production_company": _STRING,
+        "plot_summary": {"type": "string", "description": "Spoiler-free synopsis"},
+        "storyline": _STRING,
+        "tagline": _STRING,
+        "themes": _STRINGS,
+        "trivia": _STRINGS,
+        "goofs": _STRINGS,
+        "quotes": _STRINGS,
+        "alternate_versions": _STRINGS,
+        "connections": _STRINGS,
+        "filming_locations": _STRINGS,
+        "soundtracks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"song_name": _STRING, "artist": _STRING, "album": _STRING, "label": _STRING},
+            },
+        },
+        "box_office": {
+            "type": "object",
+            "properties": {
+                "budget": _STRING,
+                "gross_us_canada": _STRING,
+                "opening_weekend_us_canada": _STRING,
+                "gross_worldwide": _STRING,
+            },
+        },
+        "review": {"type": "string", "description": "The full written review, following the requested structure"},
+        "meta_title": {"type": "string", "description": "SEO title, max 60 characters"},
+        "meta_description": {"type": "string", "description": "SEO description, max 160 characters"},
+    },
+    "required": ["title", "release_year", "genre", "director", "stars", "plot_summary", "review"],
+}
+
+REVIEW_FUNCTION = {
+    "name": "save_review",
+    "description": "Save the structured movie review.",
+    "parameters": REVIEW_SCHEMA,
+}
+
+_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "array": list,
+    "object": dict,
+}
+
+
+class ReviewValidationError(ValueError):
+    pass
+
+
+def _coerce(value, schema, path):
+    expected = schema["type"]
+    if value is None:
+        return None
+    if expected == "integer" and isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    elif expected == "number" and isinstance(value, str):
+        try:
+            value = float(value.split("/")[0])
+        except ValueError:
+            pass
+    if not isinstance(value, _TYPES[expected]) or (expected in ("integer", "number") and isinstance(value, bool)):
+        raise ReviewValidationError(f"{path}: expected {expected}, got {type(value).__name__}")
+    if expected == "array":
+        return [_coerce(item, schema["items"], f"{path}[{i}]") for i, item in enumerate(value)]
+    if expected == "object":
+        return {
+            key: _coerce(value.get(key), sub_schema, f"{path}.{key}")
+            for key, sub_schema in schema["properties"].items()
+        }
+    return value
+
+
+def validate_review(data, schema=REVIEW_SCHEMA):
+    """
+    Checks a decoded review against the schema, coercing numeric strings.
+
+    Unknown keys are dropped and absent optional fields become None. Raises
+    ReviewValidationError on a wrong type or a missing required field.
+
+    Validation runs once on the complete function-call arguments, not incrementally
+    while they stream: structured output is requested without streaming (--stream is
+    markdown only), so a bad field still costs the whole completion.
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ReviewValidationError(f"invalid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ReviewValidationError("expected a JSON object")
+    missing = [key for key in schema.get("required", ()) if data.get(key) in (None, "", [])]
+    if missing:
+        raise ReviewValidationError(f"missing required fields: {', '.join(missing)}")
+    return _coerce(data, schema, "review")
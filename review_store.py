@@ -0,0 +1,141 @@
+import os
+import json
+import argparse
+import threading
+
+
+def end_torn_line(path):
+    """
+    Terminates a line left unfinished by a crash, so the next append starts on a line
+    of its own instead of being merged into the torn fragment.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+class ReviewStore:
+    """
+    Append-only review store: one JSON record per line, written by a single guarded writer.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        end_torn_line(self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, review):
+        """
+        Appends a single review as one line. Safe to call from many threads.
+        """
+        line = json.dumps(review, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.open()
+            self._file.write(line)
+            self._file.flush()
+
+    def iter_reviews(self):
+        """
+        Yields stored reviews in write order, skipping malformed lines such as one torn by a crash.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def _latest_offsets(self):
+        """
+        First pass of the export: byte offset of the last line per movie, keeping only
+        movie names and integers in memory. A partial record never replaces a complete one.
+        """
+        offsets = {}
+        complete = set()
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    review = json.loads(line)
+                except ValueError:
+                    review = None
+                if isinstance(review, dict):
+                    movie_name = review.get("movie_name")
+                    if not review.get("partial"):
+                        complete.add(movie_name)
+                        offsets[movie_name] = offset
+                    elif movie_name not in complete:
+                        offsets[movie_name] = offset
+                offset += len(line)
+        return offsets
+
+    def export_json(self, output_path):
+        """
+        Compacts the log into a JSON array (last write per movie wins) and returns the count.
+
+        Streams in two passes so memory holds line offsets rather than every review.
+        """
+        offsets = self._latest_offsets() if os.path.exists(self.path) else {}
+
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as outfile:
+            outfile.write("[")
+            if offsets:
+                with open(self.path, 'rb') as f:
+                    # Offsets in file order keep the previous "last write" ordering and read forward only
+                    for i, offset in enumerate(sorted(offsets.values())):
+                        f.seek(offset)
+                        review = json.loads(f.readline())
+                        body = json.dumps(review, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+                        outfile.write(("," if i else "") + "\n    " + body)
+                outfile.write("\n")
+            outfile.write("]")
+        os.replace(tmp_path, output_path)
+        return len(offsets)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact a JSONL review log into a JSON array.")
+    parser.add_argument("log", nargs="?", default="output/movie_reviews.jsonl",
+                        help="Review log (default: output/movie_reviews.jsonl)")
+    parser.add_argument("output", nargs="?", default="output/movie_reviews.json",
+                        help="JSON array to write (default: output/movie_reviews.json)")
+    args = parser.parse_args(argv)
+    count = ReviewStore(args.log).export_json(args.output)
+    print(f"Exported {count} reviews to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
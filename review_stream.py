@@ -0,0 +1,74 @@
+from c2 import SECTION_NAMES, SECTION_HEADER_RE
+
+# A header split across chunks can start at most this many characters before new text
+_MAX_HEADER_LENGTH = max(len(f"**{name}:**") for name in SECTION_NAMES)
+
+
+class SectionStream:
+    """
+    Splits a streamed markdown review into sections as the tokens arrive.
+
+    A section is complete once the next header appears. It is then passed to
+    on_section(name, body) and dropped from the working buffer, so only the
+    tail of the section in progress is ever rescanned.
+    """
+
+    def __init__(self, on_section=None):
+        self.on_section = on_section
+        self.preamble = ""
+        self.sections = []
+        self._buffer = ""
+        self._current = None
+
+    def feed(self, text):
+        scan_from = max(0, len(self._buffer) - _MAX_HEADER_LENGTH)
+        self._buffer += text
+        while True:
+            start = scan_from if self._current is None else max(scan_from, self._current.end())
+            match = SECTION_HEADER_RE.search(self._buffer, start)
+            if match is None:
+                return
+            self._finish(match.start())
+            self._buffer = self._buffer[match.start():]
+            self._current = SECTION_HEADER_RE.match(self._buffer)
+            scan_from = 0
+
+    def _finish(self, end):
+        if self._current is None:
+            self.preamble = self._buffer[:end].strip()
+            return
+        name = self._current.group(1)
+        body = self._buffer[self._current.end():end].strip()
+        self.sections.append((name, body))
+        if self.on_section is not None:
+            self.on_section(name, body)
+
+    def close(self):
+        """
+        Emits the last section; call once the stream has ended cleanly.
+        """
+        if self._current is not None:
+            self._finish(len(self._buffer))
+            self._buffer = ""
+            self._current = None
+
+    def text(self):
+        """
+        The review so far: finished sections plus whatever is still buffered.
+        """
+        parts = [self.preamble] if self.preamble else []
+        parts.extend(f"**{name}:**\n{body}\n" for name, body in self.sections)
+        if self._buffer.strip():
+            parts.append(self._buffer.strip())
+        return "\n".join(parts).strip()
+
+
+class PartialReviewError(Exception):
+    """
+    Raised when a stream breaks off; carries the review text received so far.
+    """
+
+    def __init__(self, movie_name, text):
+        super().__init__(f"stream for {movie_name} ended early after {len(text)} characters")
+        self.movie_name = movie_name
+        self.text = text
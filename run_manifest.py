@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import threading
+
+from review_store import end_torn_line
+
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class RunManifest:
+    """
+    Checkpoint log of per-title outcomes (status, attempt count, last error), one JSON line per event.
+
+    The latest line for a title wins, so replaying the file after a crash restores
+    the state of the interrupted run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """
+        Replays the manifest file into memory, ignoring malformed lines such as one torn by a crash.
+        """
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.entries[entry["movie_name"]] = entry
+        return self
+
+    def open(self, resume=False):
+        """
+        Opens the manifest for writing, keeping previous entries only when resuming.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume:
+            self.load()
+            end_torn_line(self.path)
+        else:
+            self.entries = {}
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        return self
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def is_completed(self, movie_name):
+        entry = self.entries.get(movie_name)
+        return entry is not None and entry["status"] == COMPLETED
+
+    def record(self, movie_name, status, error=None, attempts=1):
+        with self._lock:
+            previous = self.entries.get(movie_name)
+            entry = {
+                "movie_name": movie_name,
+                "status": status,
+                "attempts": (previous["attempts"] if previous else 0) + attempts,
+                "error": str(error) if error is not None else None,
+                "updated": time.time(),
+            }
+            self.entries[movie_name] = entry
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def summary(self):
+        counts = {COMPLETED: 0, FAILED: 0}
+        for entry in self.entries.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
@@ -1,18 +1,73 @@
 import os
-import openai
+import time
 import json
-import threading
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+import socket
+import asyncio
+import argparse
+from review_store import ReviewStore
+from review_db import ReviewDatabase
+from engine import run_pipeline
+from job_queue import JobQueue, DONE
+from http_client import ConnectionPool
+from response_cache import ResponseCache
+from title_loader import iter_titles, load_popularity
+from regen_plan import request_fingerprint, stored_fingerprints, plan_regeneration
+from review_stream import SectionStream, PartialReviewError
+from review_schema import REVIEW_FUNCTION, ReviewValidationError, validate_review
+from run_manifest import RunManifest, COMPLETED, FAILED
+from token_budget import TokenBudget, TruncatedReviewError
+from retry import RetryPolicy, RetryBudget, RetriesExhausted, DeadLetterQueue, classify_error
+from metrics import Metrics
+from rate_limit import RateLimiter, AdaptiveConcurrency, estimate_request_tokens, is_overload_error
+
+openai = None  # Imported on the first API call by load_openai(); importing this module stays fast
 
 # File paths
-input_file = "data/movies.txt"  # A notepad file containing movie names
-output_file = "output/movie_reviews.json"
-
-# Role prompt and primer
+input_file = "data/movies.txt"  # A notepad file (or .csv/.jsonl) containing movie names
+output_file = "output/movie_reviews.json"  # Compacted JSON array, exported at the end of a run with --export-json
+store_file = "output/movie_reviews.jsonl"  # Append-only log, one review per line
+cache_file = "output/response_cache.sqlite3"  # Completions keyed by a hash of the full request
+manifest_file = "output/run_manifest.jsonl"  # Per-title status of the current run, used by --resume
+batch_dir = "output/batches"  # Batch API input files
+batch_ledger_file = "output/batches/submitted.jsonl"  # Batch ids submitted by this run; --resume reattaches to them
+section_file = "output/review_sections.jsonl"  # Sections emitted as they stream in (--stream)
+partial_file = "output/partial_reviews.jsonl"  # Text of streams that broke off, kept apart from finished reviews
+token_report_file = "output/token_report.json"  # Token and cost accounting for the last run
+metrics_file = "output/metrics.json"  # Final (and, with --metrics-interval, periodic) metrics summary
+dead_letter_file = "output/dead_letter.txt"  # Titles that failed in the last run; usable as --input
+db_file = "output/reviews.sqlite3"  # Indexed, searchable review database (--db)
+queue_file = "output/job_queue.sqlite3"  # Work queue shared by --mode coordinator and --mode worker
+
+model_name = "gpt-3.5-turbo"
+
+review_store = ReviewStore(store_file)
+run_manifest = RunManifest(manifest_file)
+section_store = ReviewStore(section_file)
+partial_store = ReviewStore(partial_file)
+dead_letter = DeadLetterQueue(dead_letter_file)
+
+# Shared request/token budget for every OpenAI call, set just under the account limits
+rate_limiter = RateLimiter(
+    requests_per_minute=int(os.getenv("OPENAI_RPM", "3500")),
+    tokens_per_minute=int(os.getenv("OPENAI_TPM", "90000")),
+)
+concurrency_controller = AdaptiveConcurrency()
+response_cache = None  # Opened in main() unless --no-cache is given
+review_database = None  # Opened in main() when --db is given
+job_queue = None  # Opened in main() in coordinator and worker modes
+truncated_titles = set()  # Titles cut off at the adaptive max_tokens; their retries use the ceiling
+review_fingerprint = None  # Hash of prompts, model and parameters, stamped on every review (set in main())
+structured_output = False  # Ask for schema-validated JSON via function calling (--format structured)
+stream_output = False  # Stream completions and emit sections as they finish (--stream)
+token_budget = TokenBudget(model=model_name)
+connection_pool = ConnectionPool()  # Resized from --concurrency in main()
+retry_policy = RetryPolicy()
+pipeline_metrics = Metrics()
+pipeline_metrics.set_gauge("completion_tokens_per_second",
+                           lambda: token_budget.completion_tokens / max(pipeline_metrics.uptime(), 1e-9))
+
+# Role prompt and primer. Both are identical for every title and sent first, so the
+# provider can cache the prefix; only the short movie_prompt varies per request.
 role_prompt = """
     Assume the role of an expert movie reviewer with years of experience and a proven track record.
     You have reviewed thousands of movies across genres and eras. Your reviews are structured, detailed, and SEO-optimized. 
@@ -21,7 +76,7 @@ role_prompt = """
 """
 
 primer = """
-Your task is to write a comprehensive, SEO-ready, and structured movie review for the movie {movie_name}. Each review should include the following elements:
+Your task is to write a comprehensive, SEO-ready, and structured movie review for the movie named in the user message. Each review should include the following elements:
 
 1. Title:
    - Create an engaging, SEO-friendly title that includes the film’s name, key genre, and perhaps notable performances.
@@ -129,186 +184,633 @@ Your task is to write a comprehensive, SEO-ready, and structured movie review fo
 Ensure that each section is well-structured, formatted clearly for readability, and maintains a professional yet approachable tone. Your review should offer a comprehensive and in-depth analysis that appeals to both casual viewers and film enthusiasts.
 """
 
-def send_primer():
+movie_prompt = "Write the review for the movie {movie_name}."
+
+system_prompt = role_prompt + primer
+
+def load_environment():
     """
-    Sends the initial primer message to OpenAI API to establish context.
+    Loads variables from a .env file into the environment.
     """
-    openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": role_prompt},
-            {"role": "user", "content": primer}
-        ],
-        max_tokens=150,
-    )
-    print("Primer set successfully.")
+    from dotenv import load_dotenv
+    load_dotenv()
 
-def generate_movie_review(movie_name):
+def load_openai():
+    """
+    Imports and configures the openai package on first use and returns it.
     """
-    Generates a structured movie review based on the movie name.
+    global openai
+    if openai is None:
+        import openai as module
+        module.api_key = os.getenv("OPENAI_API_KEY")
+        module.api_base = os.getenv("OPENAI_API_BASE", module.api_base)  # Point at a local fake server for testing
+        openai = module
+    return openai
+
+def build_request(movie_name):
     """
-    prompt = primer.format(movie_name=movie_name)
-    
-    # Make a request to the OpenAI ChatCompletion API
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": role_prompt},
-            {"role": "user", "content": prompt}
+    Builds the ChatCompletion request parameters for a movie.
+    """
+    request = {
+        "model": model_name,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": movie_prompt.format(movie_name=movie_name)}
         ],
-        max_tokens=4000,
-        temperature=0.7
-    )
-    
-    # Extract the text from the API response
-    review_content = response['choices'][0]['message']['content'].strip()
-    
-    # Create a structured review dictionary
-    review = {
-        "movie_name": movie_name,
-        "release_year": 1994,  # Example data, replace with actual data
-        "rating": "R",  # Example data, replace with actual data
-        "runtime": "2h 22m",  # Example data, replace with actual data
-        "imdb_rating": 9.3,  # Example data, replace with actual data
-        "your_rating": 8.5,  # Example data, replace with actual data
-        "popularity": 85,  # Example data, replace with actual data
-        "genre": "Drama",  # Example data, replace with actual data
-        "plot_summary": "A banker convicted of uxoricide forms a friendship over a quarter century with a hardened convict, while maintaining his innocence and trying to remain hopeful through simple compassion.",  # Example data, replace with actual data
-        "director": "Frank Darabont",  # Example data, replace with actual data
-        "writers": [
-            "Stephen King",
-            "Frank Darabont"
-        ],  # Example data, replace with actual data
-        "stars": [
-            "Tim Robbins",
-            "Morgan Freeman",
-            "Bob Gunton"
-        ],  # Example data, replace with actual data
-        "storyline": "Chronicles the experiences of a formerly successful banker as a prisoner in the gloomy jailhouse of Shawshank after being found guilty of a crime he did not commit. The film portrays the man's unique way of dealing with his new, torturous life; along the way he befriends a number of fellow prisoners, most notably a wise long-term inmate named Red.",  # Example data, replace with actual data
-        "tagline": "Fear can hold you prisoner. Hope can set you free.",  # Example data, replace with actual data
-        "mpaa_rating": "Rated R for language and prison violence",  # Example data, replace with actual data
-        "trivia": [
-            "Andy and Red's opening chat in the prison yard, in which Red is throwing a baseball, took nine hours to shoot.",
-            "Heywood is shown listening to the record '24 of Hank Williams' Greatest Hits', released in 1970."
-        ],  # Example data, replace with actual data
-        "goofs": [
-            "Circa 1963, Heywood is shown listening to the record '24 of Hank Williams' Greatest Hits', released in 1970."
-        ],  # Example data, replace with actual data
-        "quotes": [
-            "Andy Dufresne: I guess it comes down to a simple choice, really. Get busy living, or get busy dying."
-        ],  # Example data, replace with actual data
-        "crazy_credits": [
-            "The man who cried and was beaten when Andy first arrived is listed and credited as 'Fat Ass'."
-        ],  # Example data, replace with actual data
-        "alternate_versions": [
-            "The film was produced independently by Castle Rock Entertainment but distributed by Columbia Pictures."
-        ],  # Example data, replace with actual data
-        "connections": [
-            "Featured in Siskel & Ebert: Why Gump? Why Now? (1994)"
-        ],  # Example data, replace with actual data
-        "soundtracks": [
-            {
-                "song_name": "If I Didn't Care",
-                "artist": "The Ink Spots",
-                "album": "24 of Hank Williams' Greatest Hits",
-                "label": "MCA Records"
-            }
-        ],  # Example data, replace with actual data
-        "user_reviews": [
-            {
-                "rating": 10,
-                "title": "This is How Movies Should Be Made",
-                "review_text": "This movie is not your ordinary Hollywood flick. It has a great and deep message.",
-                "helpful_votes": 997
-            }
-        ],  # Example data, replace with actual data
-        "release_date": "October 14, 1994",  # Example data, replace with actual data
-        "country_of_origin": "United States",  # Example data, replace with actual data
-        "official_sites": [
-            "Official Facebook",
-            "Warner Bros. (United States)"
-        ],  # Example data, replace with actual data
-        "filming_locations": [
-            "Mansfield Reformatory - 100 Reformatory Road, Mansfield, Ohio, USA"
-        ],  # Example data, replace with actual data
-        "production_company": "Castle Rock Entertainment",  # Example data, replace with actual data
-        "box_office": {
-            "budget": "$25,000,000 (estimated)",
-            "gross_us_canada": "$28,767,189",
-            "opening_weekend_us_canada": "$727,327 (Sep 25, 1994)",
-            "gross_worldwide": "$29,331,700"
-        },  # Example data, replace with actual data
-        "tech_specs": {
-            "runtime": "2 hours 22 minutes",
-            "sound_mix": "Dolby Digital",
-            "aspect_ratio": "1.85 : 1"
-        }  # Example data, replace with actual data
+        "max_tokens": token_budget.ceiling if movie_name in truncated_titles else token_budget.max_tokens(),
+        "temperature": 0.7,
     }
-    
-    return review
+    if structured_output:
+        request["functions"] = [REVIEW_FUNCTION]
+        request["function_call"] = {"name": REVIEW_FUNCTION["name"]}
+    return request
 
-def save_review(review):
+async def generate_movie_review_async(movie_name):
+    """
+    Generates a review for one movie, from the response cache or one ChatCompletion call.
+    """
+    request = build_request(movie_name)
+    review = cached_review(movie_name, request)
+    if review is not None:
+        return review
+
+    async with concurrency_controller:
+        with pipeline_metrics.timer("rate_limit_wait"):
+            await rate_limiter.acquire(estimate_request_tokens(request))
+        try:
+            with pipeline_metrics.timer("api"):
+                response = await load_openai().ChatCompletion.acreate(
+                    request_timeout=connection_pool.request_timeout, **request)
+        except Exception as e:
+            pipeline_metrics.increment(f"api_errors_{classify_error(e)}")
+            if is_overload_error(e):
+                concurrency_controller.on_overload()
+            raise
+        concurrency_controller.on_success()
+    token_budget.record(request, response)
+    return review_from_response(movie_name, request, response)
+
+async def generate_movie_review_stream_async(movie_name, on_section=None):
+    """
+    Streams a markdown review, calling on_section(name, body) as each section completes.
+
+    If the stream breaks off, PartialReviewError carries the text received so far.
+    """
+    request = build_request(movie_name)
+    review = cached_review(movie_name, request)
+    if review is not None:
+        # Replay the cached text so the section log is complete for cache hits too
+        sections = SectionStream(on_section)
+        sections.feed(review["review"])
+        sections.close()
+        return review
+
+    sections = SectionStream(on_section)
+    async with concurrency_controller:
+        with pipeline_metrics.timer("rate_limit_wait"):
+            await rate_limiter.acquire(estimate_request_tokens(request))
+        try:
+            finish_reason = None
+            started = time.perf_counter()
+            with pipeline_metrics.timer("api"):
+                stream = await load_openai().ChatCompletion.acreate(
+                    stream=True, request_timeout=connection_pool.request_timeout, **request)
+                async for chunk in stream:
+                    choice = chunk['choices'][0]
+                    content = choice.get('delta', {}).get('content')
+                    if content:
+                        if started is not None:
+                            pipeline_metrics.observe("api_first_token", time.perf_counter() - started)
+                            started = None
+                        sections.feed(content)
+                    finish_reason = choice.get('finish_reason') or finish_reason
+            if finish_reason is None:
+                raise ConnectionError("stream closed before the completion finished")
+        except Exception as e:
+            pipeline_metrics.increment(f"api_errors_{classify_error(e)}")
+            if is_overload_error(e):
+                concurrency_controller.on_overload()
+            if sections.text():
+                raise PartialReviewError(movie_name, sections.text()) from e
+            raise
+        concurrency_controller.on_success()
+    sections.close()
+
+    # Cache in the non-streaming response shape so later runs can reuse it
+    response = {"choices": [{
+        "message": {"role": "assistant", "content": sections.text()},
+        "finish_reason": finish_reason,
+    }]}
+    token_budget.record(request, response)
+    return review_from_response(movie_name, request, response)
+
+def save_section(movie_name, section, body):
+    """
+    Appends one finished section to the section log.
     """
-    Saves a single movie review to the JSON file.
+    section_store.append({"movie_name": movie_name, "section": section, "body": body})
+
+def cached_review(movie_name, request):
+    """
+    Returns the review built from a cached response, or None on a cache miss.
+
+    A cached response that no longer validates is dropped so the title is regenerated.
     """
+    response = response_cache.get(request) if response_cache else None
+    if response is None:
+        return None
     try:
-        # Load existing reviews
-        if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-            with open(output_file, 'r') as f:
-                movie_reviews = json.load(f)
-        else:
-            movie_reviews = []
+        review = build_review(movie_name, response)
+    except ReviewValidationError:
+        response_cache.discard(request)
+        return None
+    pipeline_metrics.increment("cache_hits")
+    return review
 
-        # Append the new review
-        movie_reviews.append(review)
+def review_from_response(movie_name, request, response):
+    """
+    Builds the review for a fresh response and caches the response only once it validated.
+
+    A completion cut off at max_tokens raises TruncatedReviewError instead of being
+    saved as finished; the retry asks for the full token ceiling.
+    """
+    if response["choices"][0].get("finish_reason") == "length":
+        truncated_titles.add(movie_name)
+        raise TruncatedReviewError(movie_name, request["max_tokens"])
+    review = build_review(movie_name, response)
+    if response_cache:
+        response_cache.put(request, response)
+    return review
 
-        # Save back to the file
-        with open(output_file, 'w') as outfile:
-            json.dump(movie_reviews, outfile, indent=4)
+def build_review(movie_name, response):
+    """
+    Builds the review record from a ChatCompletion response.
+
+    Structured responses (a save_review function call) are validated against the
+    review schema once the whole call has arrived, and kept field by field; plain
+    responses keep the markdown text.
+    """
+    with pipeline_metrics.timer("parse"):
+        message = response['choices'][0]['message']
+        function_call = message.get('function_call')
+        if function_call:
+            return {"movie_name": movie_name, **validate_review(function_call['arguments']),
+                    "fingerprint": review_fingerprint}
+
+        # Extract the text from the API response
+        review_content = message['content'].strip()
+        return {"movie_name": movie_name, "review": review_content, "fingerprint": review_fingerprint}
+
+def save_review(review):
+    """
+    Appends a single movie review to the review log.
+    """
+    try:
+        with pipeline_metrics.timer("save"):
+            review_store.append(review)
+            if review_database:
+                review_database.add(review)
+        return True
     except Exception as e:
         print(f"Error saving review for {review['movie_name']}: {e}")
+        return False
 
-def process_movie(movie_name):
+async def process_movie_async(movie_name):
     """
-    Processes a single movie to generate and save its review.
+    Generates, saves and records the review for one movie; the handler run by the pipeline workers.
     """
+    emitted = set()
+
+    def on_section(section, body):
+        # A retry streams the review again from the start; log each section once
+        if section not in emitted:
+            emitted.add(section)
+            save_section(movie_name, section, body)
+
+    def generate():
+        if stream_output:
+            return generate_movie_review_stream_async(movie_name, on_section=on_section)
+        return generate_movie_review_async(movie_name)
+
     try:
-        # Generate the review
-        review = generate_movie_review(movie_name)
-        
-        # Save the review
-        save_review(review)
-        
-        # Print progress
-        print(f"Review for {movie_name} generated and saved successfully.")
-    except Exception as e:
-        print(f"Error processing movie {movie_name}: {e}")
-
-def main():
-    # Send the primer message to the API
-    send_primer()
-    
-    # Load movie names from the notepad file
-    with open(input_file, 'r') as f:
-        movie_names = f.readlines()
-    
-    # Create threads for processing movies
-    threads = []
-    for movie_name in movie_names:
-        movie_name = movie_name.strip()
-        thread = threading.Thread(target=process_movie, args=(movie_name,))
-        threads.append(thread)
-        thread.start()
-        
-        # Limit the number of concurrent threads
-        if len(threads) >= 100:
-            for t in threads:
-                t.join()
-            threads = []
-    
-    # Wait for all threads to complete
-    for t in threads:
-        t.join()
+        review, attempts = await retry_policy.run(generate)
+    except RetriesExhausted as e:
+        if isinstance(e.error, PartialReviewError):
+            # Keep what arrived apart from the review log, so it never replaces a finished review;
+            # the failed manifest entry makes --resume regenerate it
+            partial_store.append({"movie_name": movie_name, "review": e.error.text, "partial": True})
+        fail_movie(movie_name, e, attempts=e.attempts)
+        return
+    finish_movie(movie_name, review, attempts=attempts)
+
+def finish_movie(movie_name, review, attempts=1):
+    """
+    Saves a generated review and records the outcome in the run manifest.
+    """
+    if not save_review(review):
+        run_manifest.record(movie_name, FAILED, "review could not be saved", attempts=attempts)
+        return
+    run_manifest.record(movie_name, COMPLETED, attempts=attempts)
+    pipeline_metrics.increment("reviews_completed")
+    print(f"Review for {movie_name} generated and saved successfully.")
+
+def fail_movie(movie_name, error, attempts=1):
+    """
+    Records a title that could not be generated and sends it to the dead-letter file.
+    """
+    run_manifest.record(movie_name, FAILED, error, attempts=attempts)
+    pipeline_metrics.increment("reviews_failed")
+    dead_letter.add(movie_name)
+    print(f"Error processing movie {movie_name}: {error}")
+
+def run_batch(movie_names, poll_interval=60, resume=False):
+    """
+    Generates reviews through the OpenAI Batch API instead of one synchronous call per title.
+
+    Titles already in the response cache are saved directly; the rest are written to
+    batch input files, submitted, polled and merged back into the review store.
+    Submitted batch ids are recorded as they are created; with resume=True the run
+    reattaches to the batches of the interrupted run instead of submitting their
+    titles again.
+    """
+    from batch_jobs import (BatchClient, write_batch_files, submit_batches, wait_for_batches,
+                            iter_batch_results, load_submissions, read_custom_ids)
+
+    submissions = load_submissions(batch_ledger_file) if resume else {}
+    if not resume and os.path.exists(batch_ledger_file):
+        os.remove(batch_ledger_file)
+    in_flight = set()
+    for path in submissions.values():
+        in_flight.update(read_custom_ids(path))
+    if submissions:
+        print(f"Reattaching to {len(submissions)} submitted batches covering {len(in_flight)} titles.")
+
+    def uncached(names):
+        for movie_name in names:
+            if movie_name in in_flight:
+                continue
+            review = cached_review(movie_name, build_request(movie_name))
+            if review is None:
+                yield movie_name
+            else:
+                finish_movie(movie_name, review)
+
+    paths = write_batch_files(uncached(movie_names), build_request, batch_dir)
+    if not paths and not submissions:
+        return
+
+    api = load_openai()
+    client = BatchClient(api.api_base, api.api_key, session=connection_pool.sync_session())
+    submissions.update(submit_batches(client, paths, ledger_path=batch_ledger_file))
+    batches = wait_for_batches(client, list(submissions), poll_interval=poll_interval)
+    for movie_name, response, error in iter_batch_results(client, batches, input_paths=submissions):
+        if run_manifest.is_completed(movie_name):
+            continue  # Already merged before the previous run was interrupted
+        if error is not None:
+            fail_movie(movie_name, error)
+            continue
+        request = build_request(movie_name)
+        token_budget.record(request, response)
+        try:
+            review = review_from_response(movie_name, request, response)
+        except (ReviewValidationError, TruncatedReviewError) as e:
+            # One bad result must not cost the rest of the batch
+            fail_movie(movie_name, e)
+            continue
+        finish_movie(movie_name, review)
+
+async def run_async(movie_names, concurrency):
+    """
+    Runs the asyncio pipeline with the shared connection pool open.
+    """
+    async with connection_pool:
+        await run_pipeline(movie_names, process_movie_async, concurrency=concurrency, metrics=pipeline_metrics)
+
+def run_coordinator(movie_names, poll_interval=2.0):
+    """
+    Enqueues titles for worker processes and records their results as they are acked.
+
+    Runs until no title is pending or leased. Expired leases are requeued on every poll,
+    so jobs held by a dead worker go back to the live ones.
+    """
+    # Workers adopt these rather than their own --format, so every review carries this run's fingerprint
+    job_queue.set_settings(model=model_name, structured=structured_output, fingerprint=review_fingerprint,
+                           enqueued=False)
+    added = job_queue.enqueue(movie_names)
+    job_queue.set_settings(enqueued=True)
+    print(f"Enqueued {added} titles in {job_queue.path}; waiting for workers.")
+    while True:
+        # Count before collecting so a job finishing in between is collected on the next pass
+        remaining = job_queue.outstanding()
+        finished = job_queue.collect()
+        for movie_name, status, review, error, attempts in finished:
+            if status == DONE:
+                finish_movie(movie_name, review, attempts=attempts)
+            else:
+                fail_movie(movie_name, error, attempts=attempts)
+        if remaining == 0 and not finished:
+            break
+        if not finished:
+            job_queue.requeue_expired()
+            time.sleep(poll_interval)
+
+def adopt_queue_settings(settings):
+    """
+    Switches this worker to the model and format the coordinator recorded in the queue.
+
+    Returns False if the reviews would still get another fingerprint than the
+    coordinator's, i.e. this worker runs different prompts or parameters.
+    """
+    global model_name, structured_output, review_fingerprint
+    model_name = settings.get("model", model_name)
+    structured_output = settings.get("structured", structured_output)
+    review_fingerprint = request_fingerprint(build_request)
+    expected = settings.get("fingerprint", review_fingerprint)
+    if review_fingerprint != expected:
+        print(f"Worker fingerprint {review_fingerprint} does not match the coordinator's {expected}; "
+              f"check that both run the same version of the prompts.")
+        return False
+    return True
+
+async def run_worker(worker_id, concurrency, poll_interval=2.0, idle_timeout=60.0):
+    """
+    Leases titles from the job queue, generates their reviews and acks the results.
+
+    Leases are renewed every third of the lease period while calls are in flight. The
+    worker exits once the coordinator has enqueued everything and nothing is pending
+    or leased by another worker, or after idle_timeout seconds without any work (so
+    it can be started before the coordinator). It hands back any titles it still
+    holds if it is stopped early.
+    """
+    active = set()
+
+    async def leased_titles():
+        adopted = None
+        worked = False
+        idle_since = time.monotonic()
+        while True:
+            names = await asyncio.to_thread(job_queue.lease, worker_id, min(concurrency, 100))
+            if names:
+                # Read the settings after leasing: they are written before the titles are enqueued
+                settings = await asyncio.to_thread(job_queue.settings)
+                if settings != adopted:
+                    if not adopt_queue_settings(settings):
+                        await asyncio.to_thread(job_queue.release, worker_id, names)
+                        return
+                    adopted = settings
+                worked = True
+                active.update(names)
+                for movie_name in names:
+                    yield movie_name
+                idle_since = time.monotonic()
+            elif await asyncio.to_thread(job_queue.outstanding, worker_id) > 0:
+                idle_since = time.monotonic()
+                await asyncio.sleep(poll_interval)
+            elif worked and (await asyncio.to_thread(job_queue.settings)).get("enqueued"):
+                return
+            elif time.monotonic() - idle_since >= idle_timeout:
+                print(f"Worker {worker_id}: no work for {idle_timeout:g}s, exiting.")
+                return
+            else:
+                await asyncio.sleep(poll_interval)
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(job_queue.lease_seconds / 3)
+            if active:
+                await asyncio.to_thread(job_queue.heartbeat, worker_id, list(active))
+
+    async def handle(movie_name):
+        try:
+            review, attempts = await retry_policy.run(lambda: generate_movie_review_async(movie_name))
+        except RetriesExhausted as e:
+            await asyncio.to_thread(job_queue.fail, worker_id, movie_name, e, e.attempts)
+            pipeline_metrics.increment("reviews_failed")
+            print(f"Error processing movie {movie_name}: {e}")
+        else:
+            await asyncio.to_thread(job_queue.ack, worker_id, movie_name, review, attempts)
+            pipeline_metrics.increment("reviews_completed")
+            print(f"Review for {movie_name} generated and acked.")
+        finally:
+            active.discard(movie_name)
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        async with connection_pool:
+            await run_pipeline(leased_titles(), handle, concurrency=concurrency, metrics=pipeline_metrics)
+    finally:
+        beat.cancel()
+        if active:
+            job_queue.release(worker_id, list(active))
+
+def plan_stale_titles(movie_names, popularity_file=None):
+    """
+    Narrows the input to titles whose stored review doesn't match the current fingerprint.
+
+    Popular titles come first when popularity_file has a popularity column, so an
+    interrupted regeneration has already refreshed the reviews that matter most.
+    """
+    movie_names = list(movie_names)
+    fingerprints = stored_fingerprints(review_store.iter_reviews())
+    popularity = load_popularity(popularity_file) if popularity_file else None
+    stale = plan_regeneration(movie_names, fingerprints, review_fingerprint, popularity)
+    print(f"{len(stale)} of {len(movie_names)} titles need regenerating (fingerprint {review_fingerprint}).")
+    return stale
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate structured movie reviews.")
+    parser.add_argument("--mode", choices=("sync", "batch", "coordinator", "worker"), default="sync",
+                        help="sync: concurrent ChatCompletion calls; batch: submit through the Batch API; "
+                             "coordinator/worker: share the titles of one run between several processes on this host "
+                             "through a SQLite job queue (default: sync)")
+    parser.add_argument("--format", choices=("markdown", "structured"), default="markdown",
+                        help="markdown: keep the review text; structured: schema-validated JSON fields "
+                             "(default: markdown; workers use the coordinator's format)")
+    parser.add_argument("--stream", action="store_true",
+                        help=f"Stream completions and append each finished section to {section_file}")
+    parser.add_argument("--poll-interval", type=float, default=60,
+                        help="Seconds between Batch API status checks in batch mode (default: 60)")
+    parser.add_argument("--input", default=input_file,
+                        help=f"Movie list: one title per line, or .csv/.jsonl with a title and optional year (default: {input_file})")
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="Maximum number of API requests in flight (default: 100)")
+    parser.add_argument("--connect-timeout", type=float, default=10,
+                        help="Seconds to establish a connection (default: 10)")
+    parser.add_argument("--request-timeout", type=float, default=120,
+                        help="Seconds allowed for a whole API request (default: 120)")
+    parser.add_argument("--max-attempts", type=int, default=5,
+                        help="Attempts per title before it goes to the dead-letter file (default: 5)")
+    parser.add_argument("--deadline", type=float, default=600,
+                        help="Seconds a title may spend across all its attempts (default: 600)")
+    parser.add_argument("--retry-budget", type=float, default=0.2,
+                        help="Fast retries earned per successful call; past it, retries wait the full "
+                             "backoff ceiling (default: 0.2)")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus /metrics and /metrics.json on this local port")
+    parser.add_argument("--metrics-interval", type=float,
+                        help=f"Also rewrite {metrics_file} every this many seconds during the run")
+    parser.add_argument("--rpm", type=int, help="Requests per minute budget (default: $OPENAI_RPM or 3500)")
+    parser.add_argument("--tpm", type=int, help="Tokens per minute budget (default: $OPENAI_TPM or 90000)")
+    parser.add_argument("--price-input", type=float, help="USD per 1k prompt tokens for the cost report")
+    parser.add_argument("--price-output", type=float, help="USD per 1k completion tokens for the cost report")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, ignoring cached responses")
+    parser.add_argument("--cache-ttl", type=float, default=30, help="Days before a cached response expires (default: 30)")
+    parser.add_argument("--cache-size", type=int, default=200000,
+                        help="Maximum cached responses before LRU eviction (default: 200000)")
+    parser.add_argument("--export-json", nargs="?", const=output_file,
+                        help=f"Also compact the review log into a JSON array after the run (default path: {output_file})")
+    parser.add_argument("--db", nargs="?", const=db_file,
+                        help=f"Also write reviews into an indexed SQLite database for lookups and search (default path: {db_file})")
+    parser.add_argument("--queue", default=queue_file,
+                        help=f"Job queue database for coordinator and worker modes; must be on a local disk, "
+                             f"not a network share (default: {queue_file})")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Name this worker records on its leases (default: host-pid)")
+    parser.add_argument("--lease-seconds", type=float, default=120,
+                        help="Seconds a leased title stays reserved without a heartbeat (default: 120)")
+    parser.add_argument("--idle-timeout", type=float, default=60,
+                        help="Seconds a worker waits for the coordinator to enqueue work before exiting "
+                             "(default: 60)")
+    parser.add_argument("--stale-only", action="store_true",
+                        help="Regenerate only titles whose stored review is missing or was made with other "
+                             "prompts, model or parameters")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print the stale titles --stale-only would regenerate, then exit")
+    parser.add_argument("--popularity",
+                        help="CSV/JSONL with a popularity or votes column used to regenerate popular titles "
+                             "first (default: the --input file, if it has one)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip titles completed by a previous run and retry only the rest")
+    args = parser.parse_args(argv)
+    if args.stream and (args.mode != "sync" or args.format == "structured"):
+        parser.error("--stream only applies to sync mode with markdown output; structured reviews are validated whole")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_environment()
+    global rate_limiter, concurrency_controller, response_cache, structured_output, stream_output, connection_pool
+    global retry_policy, review_database, job_queue, review_fingerprint
+    retry_policy = RetryPolicy(max_attempts=args.max_attempts, deadline=args.deadline,
+                               budget=RetryBudget(ratio=args.retry_budget))
+    connection_pool = ConnectionPool(size=args.concurrency, connect_timeout=args.connect_timeout,
+                                     read_timeout=args.request_timeout)
+    connection_pool.register_gauges(pipeline_metrics)
+    structured_output = args.format == "structured"
+    review_fingerprint = request_fingerprint(build_request)
+    stream_output = args.stream
+    if args.price_input is not None or args.price_output is not None:
+        input_price, output_price = token_budget.prices
+        token_budget.prices = (
+            args.price_input if args.price_input is not None else input_price,
+            args.price_output if args.price_output is not None else output_price,
+        )
+    rate_limiter = RateLimiter(
+        requests_per_minute=args.rpm or int(os.getenv("OPENAI_RPM", "3500")),
+        tokens_per_minute=args.tpm or int(os.getenv("OPENAI_TPM", "90000")),
+    )
+    # Start conservatively and let AIMD ramp up to the configured ceiling
+    concurrency_controller = AdaptiveConcurrency(initial=min(10, args.concurrency), maximum=args.concurrency)
+    if not args.no_cache:
+        response_cache = ResponseCache(cache_file, ttl=args.cache_ttl * 24 * 3600, max_entries=args.cache_size)
+    if args.db:
+        os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+        review_database = ReviewDatabase(args.db)
+
+    if args.metrics_port:
+        pipeline_metrics.serve(args.metrics_port)
+        print(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+    os.makedirs(os.path.dirname(metrics_file), exist_ok=True)
+    stop_reporting = pipeline_metrics.report_periodically(metrics_file, args.metrics_interval) \
+        if args.metrics_interval else None
+
+    if args.mode in ("coordinator", "worker"):
+        job_queue = JobQueue(args.queue, lease_seconds=args.lease_seconds)
+    if args.mode == "worker":
+        # Workers only talk to the queue; the coordinator owns the review store and manifest
+        asyncio.run(run_worker(args.worker_id, args.concurrency, idle_timeout=args.idle_timeout))
+        job_queue.close()
+        if stop_reporting:
+            stop_reporting.set()
+        metrics = pipeline_metrics.summary()["counters"]
+        print(f"Worker {args.worker_id}: {metrics.get('reviews_completed', 0)} reviews acked, "
+              f"{metrics.get('reviews_failed', 0)} failed, {token_budget.requests} API calls, "
+              f"{token_budget.prompt_tokens} prompt + {token_budget.completion_tokens} completion tokens, "
+              f"${token_budget.report()['cost_usd']:.2f}.")
+        return
+
+    # Stream unique movie names from the input file
+    movie_names = iter_titles(args.input)
+
+    if args.stale_only or args.plan:
+        movie_names = plan_stale_titles(movie_names, args.popularity or args.input)
+        if args.plan:
+            for movie_name in movie_names:
+                print(movie_name)
+            return
+
+    run_manifest.open(resume=args.resume)
+    if args.resume:
+        print(f"Resuming: skipping {run_manifest.summary()[COMPLETED]} completed titles.")
+        movie_names = (name for name in movie_names if not run_manifest.is_completed(name))
+
+    if args.mode == "batch":
+        run_batch(movie_names, poll_interval=args.poll_interval, resume=args.resume)
+    elif args.mode == "coordinator":
+        if args.resume:
+            job_queue.retry_failed()
+        else:
+            job_queue.reset()
+        run_coordinator(movie_names)
+        job_queue.close()
+    else:
+        # Keep a fixed number of requests in flight, refilling each slot as it completes
+        asyncio.run(run_async(movie_names, args.concurrency))
+
+    run_manifest.close()
+    section_store.close()
+    partial_store.close()
+    summary = run_manifest.summary()
+    print(f"Run manifest: {summary[COMPLETED]} completed, {summary[FAILED]} failed.")
+    dead_letter.flush()
+    if dead_letter.count:
+        print(f"{dead_letter.count} titles written to {dead_letter_file}; re-run them with --input {dead_letter_file}.")
+
+    review_store.close()
+    if args.export_json:
+        # Compact the review log into the JSON array
+        count = review_store.export_json(args.export_json)
+        print(f"Exported {count} reviews to {args.export_json}.")
+    if review_database:
+        print(f"Review database {args.db} holds {review_database.count()} reviews.")
+        review_database.close()
+    if args.mode == "coordinator":
+        # The API calls were made, and their tokens counted, by the workers
+        print(f"Token usage is printed by each worker; {token_report_file} was left unchanged.")
+    else:
+        report = token_budget.report(reviews=pipeline_metrics.summary()["counters"].get("reviews_completed", 0))
+        with open(token_report_file, 'w') as f:
+            json.dump(report, f, indent=4)
+        if report["reviews"]:
+            print(f"Tokens per review: {report['prompt_tokens_per_review']:.0f} prompt + "
+                  f"{report['completion_tokens_per_review']:.0f} completion, "
+                  f"${report['cost_per_1k_titles_usd']:.2f} per 1k titles ({report['requests']} API calls "
+                  f"for {report['reviews']} reviews).")
+        else:
+            print(f"No reviews completed ({report['requests']} API calls, ${report['cost_usd']:.2f}).")
+    if stop_reporting:
+        stop_reporting.set()
+    pipeline_metrics.write_summary(metrics_file)
+    for stage, stats in pipeline_metrics.summary()["stages"].items():
+        print(f"{stage}: p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, "
+              f"p99 {stats['p99_ms']:.0f} ms over {stats['count']} calls")
+    pool_stats = connection_pool.metrics()
+    print(f"Connection pool: {pool_stats['requests']} requests over {pool_stats['connections_created']} "
+          f"new connections, {pool_stats['avg_connect_ms']:.1f} ms average connect.")
+    if response_cache:
+        stats = response_cache.stats()
+        print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses.")
+        response_cache.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,113 @@
+import os
+import time
+import tempfile
+import unittest
+
+from job_queue import JobQueue, PENDING, LEASED, DONE, FAILED
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue = self.open_queue()
+
+    def tearDown(self):
+        self.queue.close()
+        self.directory.cleanup()
+
+    def open_queue(self, **kwargs):
+        kwargs.setdefault("lease_seconds", 0.1)
+        return JobQueue(os.path.join(self.directory.name, "queue.sqlite3"), **kwargs)
+
+    def expire_leases(self):
+        time.sleep(self.queue.lease_seconds * 2)
+
+    def test_enqueue_skips_titles_already_queued(self):
+        self.assertEqual(self.queue.enqueue(["Alien", "Heat"]), 2)
+        self.assertEqual(self.queue.enqueue(["Heat", "Ran"]), 1)
+        self.assertEqual(self.queue.counts()[PENDING], 3)
+
+    def test_lease_hands_each_title_to_one_worker(self):
+        self.queue.enqueue(["Alien", "Heat", "Ran"])
+        first = self.queue.lease("a", limit=2)
+        second = self.queue.lease("b", limit=2)
+        self.assertEqual(first, ["Alien", "Heat"])
+        self.assertEqual(second, ["Ran"])
+        self.assertEqual(self.queue.lease("c"), [])
+        self.assertEqual(self.queue.outstanding(exclude_worker="a"), 1)
+
+    def test_expired_lease_is_requeued_for_another_worker(self):
+        self.queue.enqueue(["Alien"])
+        self.assertEqual(self.queue.lease("a"), ["Alien"])
+        self.expire_leases()
+        self.assertEqual(self.queue.requeue_expired(), 1)
+        self.assertEqual(self.queue.lease("b"), ["Alien"])
+        # The first worker lost its lease, so its late failure is ignored
+        self.assertFalse(self.queue.fail("a", "Alien", "boom"))
+        self.assertTrue(self.queue.ack("b", "Alien", {"movie_name": "Alien"}))
+
+    def test_heartbeat_keeps_the_lease(self):
+        self.queue.enqueue(["Alien"])
+        self.queue.lease("a")
+        for _ in range(4):
+            time.sleep(self.queue.lease_seconds / 2)
+            self.assertEqual(self.queue.heartbeat("a", ["Alien"]), 1)
+        self.assertEqual(self.queue.requeue_expired(), 0)
+        self.assertEqual(self.queue.lease("b"), [])
+
+    def test_title_fails_after_max_leases(self):
+        self.queue.close()
+        self.queue = self.open_queue(max_leases=2)
+        self.queue.enqueue(["Alien"])
+        for worker in ("a", "b"):
+            self.assertEqual(self.queue.lease(worker), ["Alien"])
+            self.expire_leases()
+        self.assertEqual(self.queue.lease("c"), [])
+        [(name, status, result, error, attempts)] = self.queue.collect()
+        self.assertEqual((name, status, result), ("Alien", FAILED, None))
+        self.assertIn("lease expired", error)
+
+    def test_release_returns_titles_without_counting_a_lease(self):
+        self.queue.close()
+        self.queue = self.open_queue(max_leases=1)
+        self.queue.enqueue(["Alien"])
+        self.queue.lease("a")
+        self.queue.release("a", ["Alien"])
+        self.assertEqual(self.queue.counts()[LEASED], 0)
+        self.assertEqual(self.queue.lease("b"), ["Alien"])
+
+    def test_collect_returns_each_finished_job_once(self):
+        self.queue.enqueue(["Alien", "Heat"])
+        self.queue.lease("a", limit=2)
+        self.queue.ack("a", "Alien", {"movie_name": "Alien", "review": "Tense."}, attempts=2)
+        self.queue.fail("a", "Heat", "deadline exceeded")
+        finished = sorted(self.queue.collect())
+        self.assertEqual(finished, [
+            ("Alien", DONE, {"movie_name": "Alien", "review": "Tense."}, None, 2),
+            ("Heat", FAILED, None, "deadline exceeded", 1),
+        ])
+        self.assertEqual(self.queue.collect(), [])
+        self.assertEqual(self.queue.outstanding(), 0)
+
+    def test_retry_failed_puts_failures_back(self):
+        self.queue.enqueue(["Alien"])
+        self.queue.lease("a")
+        self.queue.fail("a", "Alien", "boom")
+        self.assertEqual(self.queue.retry_failed(), 1)
+        self.assertEqual(self.queue.lease("b"), ["Alien"])
+
+    def test_settings_are_shared_between_connections(self):
+        self.assertEqual(self.queue.settings(), {})
+        self.queue.set_settings(model="gpt-3.5-turbo", structured=True, enqueued=False)
+        self.queue.set_settings(enqueued=True)
+        other = self.open_queue()
+        try:
+            self.assertEqual(other.settings(), {"model": "gpt-3.5-turbo", "structured": True, "enqueued": True})
+        finally:
+            other.close()
+        self.queue.reset()
+        self.assertEqual(self.queue.settings(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
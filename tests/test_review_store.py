@@ -0,0 +1,60 @@
+import os
+import json
+import tempfile
+import unittest
+
+from review_store import ReviewStore
+
+
+class ReviewStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "reviews.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def names(self, store):
+        return [review["movie_name"] for review in store.iter_reviews()]
+
+    def test_append_after_torn_line_keeps_new_reviews(self):
+        with ReviewStore(self.path) as store:
+            store.append({"movie_name": "A", "review": "First."})
+        # A crash mid-write leaves a line without its newline
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"movie_name": "B", "rev')
+        with ReviewStore(self.path) as store:
+            store.append({"movie_name": "C", "review": "Third."})
+            store.append({"movie_name": "D", "review": "Fourth."})
+        self.assertEqual(self.names(store), ["A", "C", "D"])
+        self.assertEqual(store.export_json(os.path.join(self.directory.name, "reviews.json")), 3)
+
+    def test_export_json_matches_json_dump(self):
+        reviews = [
+            {"movie_name": "Amélie", "review": "**Title:**\n\"Amélie\" – whimsical", "fingerprint": "abc"},
+            {"movie_name": "Heat", "genre": ["Crime", "Drama"], "imdb_rating": 8.3, "extras": {}, "tags": []},
+            {"movie_name": "Ran", "cast": [{"actor": "Tatsuya Nakadai", "role": None}], "year": 1985},
+            {"movie_name": "Amélie", "review": "Rewritten.", "fingerprint": "def"},
+        ]
+        with ReviewStore(self.path) as store:
+            for review in reviews:
+                store.append(review)
+        latest = {}
+        for review in reviews:
+            latest.pop(review["movie_name"], None)
+            latest[review["movie_name"]] = review
+
+        output_path = os.path.join(self.directory.name, "reviews.json")
+        self.assertEqual(store.export_json(output_path), 3)
+        with open(output_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), json.dumps(list(latest.values()), indent=4, ensure_ascii=False))
+
+    def test_export_json_of_empty_log(self):
+        output_path = os.path.join(self.directory.name, "reviews.json")
+        self.assertEqual(ReviewStore(self.path).export_json(output_path), 0)
+        with open(output_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), json.dumps([], indent=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
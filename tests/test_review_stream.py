@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from c2 import split_sections
+from converter import input_data
+from review_stream import SectionStream
+
+REVIEW = input_data[0]["review"]
+
+
+def chunks(text, rng, max_size):
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, max_size)
+        yield text[position:position + size]
+        position += size
+
+
+class SectionStreamTest(unittest.TestCase):
+    def expected(self, text):
+        return [(name, body.strip()) for name, body in split_sections(text).items()]
+
+    def stream(self, pieces):
+        emitted = []
+        stream = SectionStream(lambda name, body: emitted.append((name, body)))
+        for piece in pieces:
+            stream.feed(piece)
+        stream.close()
+        self.assertEqual(emitted, stream.sections)
+        return stream
+
+    def test_random_chunk_sizes_match_split_sections(self):
+        expected = self.expected(REVIEW)
+        self.assertGreater(len(expected), 20)
+        rng = random.Random(0)
+        for max_size in (1, 2, 3, 7, 16, 64, 500):
+            for _ in range(20):
+                with self.subTest(max_size=max_size):
+                    self.assertEqual(self.stream(chunks(REVIEW, rng, max_size)).sections, expected)
+
+    def test_whole_text_in_one_chunk(self):
+        self.assertEqual(self.stream([REVIEW]).sections, self.expected(REVIEW))
+
+    def test_header_split_at_every_position(self):
+        text = "Intro line.\n**Plot Summary:**\nA plot.\n**Taglines:**\n- \"Run.\"\n"
+        expected = self.expected(text)
+        for cut in range(1, len(text)):
+            with self.subTest(cut=cut):
+                stream = self.stream([text[:cut], text[cut:]])
+                self.assertEqual(stream.sections, expected)
+                self.assertEqual(stream.preamble, "Intro line.")
+
+    def test_section_is_emitted_once_the_next_header_arrives(self):
+        emitted = []
+        stream = SectionStream(lambda name, body: emitted.append(name))
+        stream.feed("**Plot Summary:**\nA plot.\n")
+        self.assertEqual(emitted, [])
+        stream.feed("**Tag")
+        self.assertEqual(emitted, [])
+        stream.feed("lines:**\n")
+        self.assertEqual(emitted, ["Plot Summary"])
+        stream.close()
+        self.assertEqual(emitted, ["Plot Summary", "Taglines"])
+
+
+if __name__ == "__main__":
+    unittest.main()
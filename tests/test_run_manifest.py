@@ -0,0 +1,57 @@
+import os
+import sys
+import signal
+import tempfile
+import unittest
+import subprocess
+
+from run_manifest import RunManifest, COMPLETED, FAILED
+
+# Records one title, then dies halfway through writing the next line
+KILLED_MID_LINE = """
+import os, sys, signal
+sys.path.insert(0, {root!r})
+from run_manifest import RunManifest
+manifest = RunManifest({path!r}).open(resume=True)
+manifest.record("A", "completed")
+manifest._file.write('{{"movie_name": "B", "sta')
+manifest._file.flush()
+os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+
+class RunManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "manifest.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume_after_kill_mid_line(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        process = subprocess.run([sys.executable, "-c", KILLED_MID_LINE.format(root=root, path=self.path)])
+        self.assertEqual(process.returncode, -signal.SIGKILL)
+
+        manifest = RunManifest(self.path).open(resume=True)
+        self.assertTrue(manifest.is_completed("A"))
+        manifest.record("C", COMPLETED)
+        manifest.record("D", FAILED, error="timeout")
+        manifest.close()
+
+        entries = RunManifest(self.path).load().entries
+        self.assertEqual(sorted(entries), ["A", "C", "D"])
+        self.assertEqual(entries["C"]["status"], COMPLETED)
+        self.assertEqual(entries["D"]["error"], "timeout")
+
+    def test_fresh_open_discards_previous_run(self):
+        manifest = RunManifest(self.path).open()
+        manifest.record("A", COMPLETED)
+        manifest.close()
+        manifest = RunManifest(self.path).open(resume=False)
+        manifest.close()
+        self.assertEqual(RunManifest(self.path).load().entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import csv
+import json
+import hashlib
+import unicodedata
+
+TITLE_COLUMNS = ("movie_name", "title", "name")
+POPULARITY_COLUMNS = ("popularity", "num_votes", "votes", "views")
+
+
+def normalize_title(title):
+    """
+    Cleans up a raw title: Unicode NFC, trimmed, inner whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFC", title).split())
+
+
+def title_key(title, year=None):
+    """
+    Compact 8-byte dedupe key; case-insensitive so "chappie" and "Chappie" collide.
+    """
+    raw = f"{title.casefold()}\x00{year or ''}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=8).digest()
+
+
+def _rows_from_text(f):
+    for line in f:
+        yield line, None, {}
+
+
+def _rows_from_csv(f):
+    for row in csv.DictReader(f):
+        yield _title_from_row(row), row.get("year"), row
+
+
+def _rows_from_jsonl(f):
+    for line in f:
+        if line.strip():
+            row = json.loads(line)
+            yield _title_from_row(row), row.get("year"), row
+
+
+def _title_from_row(row):
+    for column in TITLE_COLUMNS:
+        if row.get(column):
+            return str(row[column])
+    return ""
+
+
+def _iter_rows(path):
+    if path.endswith(".csv"):
+        reader = _rows_from_csv
+    elif path.endswith((".jsonl", ".ndjson")):
+        reader = _rows_from_jsonl
+    else:
+        reader = _rows_from_text
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for raw_title, year, row in reader(f):
+            title = normalize_title(raw_title)
+            if not title:
+                continue
+            year = str(year).strip() if year not in (None, "") else None
+            yield title, year, row
+
+
+def iter_titles(path):
+    """
+    Lazily yields unique, normalized movie names from a .txt, .csv or .jsonl file.
+
+    CSV/JSONL rows may carry a `year` column; it becomes part of the name
+    ("Total Recall (2012)") so remakes are generated separately. Blank titles are
+    skipped, and only an 8-byte digest per title is kept for deduplication.
+    """
+    seen = set()
+    for title, year, _ in _iter_rows(path):
+        key = title_key(title, year)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield f"{title} ({year})" if year else title
+
+
+def load_popularity(path):
+    """
+    Reads a {movie name: popularity} map from a .csv/.jsonl file's popularity or vote-count column.
+
+    Names are formatted exactly as iter_titles yields them. Rows without a numeric
+    popularity are left out; plain text files have none.
+    """
+    popularity = {}
+    for title, year, row in _iter_rows(path):
+        for column in POPULARITY_COLUMNS:
+            try:
+                value = float(str(row.get(column)).replace(",", ""))
+            except ValueError:
+                continue
+            popularity[f"{title} ({year})" if year else title] = value
+            break
+    return popularity
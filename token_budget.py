@@ -0,0 +1,125 @@
+import threading
+from collections import deque
+
+# USD per 1k tokens (input, output); override with --price-input/--price-output
+DEFAULT_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+_encodings = {}
+
+
+def count_tokens(text, model="gpt-3.5-turbo"):
+    """
+    Counts tokens with tiktoken when it is installed, else estimates ~4 characters per token.
+    """
+    if model not in _encodings:
+        try:
+            import tiktoken
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except (ImportError, KeyError):
+            _encodings[model] = None
+    encoding = _encodings[model]
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages, model="gpt-3.5-turbo"):
+    # Each chat message costs a few tokens of framing on top of its content
+    return sum(count_tokens(message["content"], model) + 4 for message in messages) + 3
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TruncatedReviewError(Exception):
+    """
+    Raised when a completion stopped at max_tokens (finish_reason "length").
+    """
+
+    def __init__(self, movie_name, max_tokens):
+        super().__init__(f"review for {movie_name} was cut off at max_tokens={max_tokens}")
+        self.movie_name = movie_name
+        self.max_tokens = max_tokens
+
+
+class TokenBudget:
+    """
+    Sizes max_tokens from observed completion lengths and keeps per-title token accounting.
+
+    Until `min_samples` completions have been seen, the ceiling is used. After that,
+    max_tokens is the p95 completion length times `headroom`. Truncated completions
+    count as ceiling-length samples, which pushes the budget back up.
+    """
+
+    def __init__(self, model="gpt-3.5-turbo", ceiling=4000, floor=512, headroom=1.25,
+                 min_samples=20, window=500, prices=None):
+        self.model = model
+        self.ceiling = ceiling
+        self.floor = floor
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.prices = prices or DEFAULT_PRICES.get(model, (0.0, 0.0))
+        self._completions = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.truncated = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def max_tokens(self):
+        with self._lock:
+            if len(self._completions) < self.min_samples:
+                return self.ceiling
+            budget = int(_percentile(self._completions, 0.95) * self.headroom)
+        return max(self.floor, min(self.ceiling, budget))
+
+    def record(self, request, response):
+        """
+        Records the token usage of one API call, preferring the usage the API reports.
+        """
+        choice = response["choices"][0]
+        usage = response.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens") or count_message_tokens(request["messages"], self.model)
+        completion_tokens = usage.get("completion_tokens")
+        if completion_tokens is None:
+            message = choice["message"]
+            text = message.get("content") or (message.get("function_call") or {}).get("arguments", "")
+            completion_tokens = count_tokens(text, self.model)
+        truncated = choice.get("finish_reason") == "length"
+
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.truncated += truncated
+            self._completions.append(self.ceiling if truncated else completion_tokens)
+
+    def report(self, reviews=0):
+        """
+        Token and cost totals. Per-call figures cover every API call, retries included;
+        per-review figures divide by `reviews`, the titles completed with these calls
+        (None until one has).
+        """
+        calls = self.requests or 1
+        input_price, output_price = self.prices
+        cost = (self.prompt_tokens * input_price + self.completion_tokens * output_price) / 1000
+        return {
+            "model": self.model,
+            "requests": self.requests,
+            "reviews": reviews,
+            "truncated": self.truncated,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_tokens_per_call": self.prompt_tokens / calls,
+            "completion_tokens_per_call": self.completion_tokens / calls,
+            "prompt_tokens_per_review": self.prompt_tokens / reviews if reviews else None,
+            "completion_tokens_per_review": self.completion_tokens / reviews if reviews else None,
+            "current_max_tokens": self.max_tokens(),
+            "cost_usd": cost,
+            "cost_per_call_usd": cost / calls,
+            "cost_per_1k_titles_usd": cost / reviews * 1000 if reviews else None,
+        }